@@ -0,0 +1,57 @@
+# Cold-start cost of the SDK: importing it, and the first use of what was imported (models are built on
+# first validation). Every case runs in a fresh interpreter; the best of several runs is reported.
+#
+#   python benchmarks/import_time.py [runs]
+
+import json
+import subprocess
+import sys
+
+EVENT = {"op": "output.update", "createdAt": "2024-01-01T00:00:00Z", "output": "answer", "value": "Hi", "append": True}
+EXECUTION = {
+    "_id": "e1",
+    "status": "running",
+    "updatedAt": "2024-01-01T00:00:00Z",
+    "pipeline": {"inputs": [], "outputs": [], "nodes": []},
+    "state": {},
+    "inputs": {},
+    "outputs": {},
+}
+
+CASES = [
+    ("import integrail_sdk", "import integrail_sdk", f"integrail_sdk.ExecutionEvent.model_validate({EVENT!r})"),
+    (
+        "types: AgentExecution, ExecutionEvent",
+        "from integrail_sdk.types import AgentExecution, ExecutionEvent",
+        f"AgentExecution.model_validate({EXECUTION!r}); ExecutionEvent.model_validate({EVENT!r})",
+    ),
+    (
+        "IntegrailCloudApi",
+        "from integrail_sdk import IntegrailCloudApi",
+        "IntegrailCloudApi({'apiToken': 'token'})",
+    ),
+]
+
+TEMPLATE = """
+import json, time
+start = time.perf_counter()
+{import_statement}
+imported = time.perf_counter()
+{first_use}
+used = time.perf_counter()
+print(json.dumps([imported - start, used - imported]))
+"""
+
+def run(import_statement: str, first_use: str) -> list:
+    code = TEMPLATE.format(import_statement=import_statement, first_use=first_use)
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'':<40} {'import':>10} {'first use':>10}")
+    for label, import_statement, first_use in CASES:
+        results = [run(import_statement, first_use) for _ in range(runs)]
+        imported = min(r[0] for r in results)
+        used = min(r[1] for r in results)
+        print(f"{label:<40} {imported * 1e3:8.1f} ms {used * 1e3:8.1f} ms")
@@ -0,0 +1,49 @@
+# Per-payload cost of local input validation.
+#
+#   python benchmarks/validate_inputs.py
+
+import timeit
+
+from integrail_sdk.types import InputsValidator, NodeDefinition, Type
+
+NODE = NodeDefinition.model_validate({
+    "name": "llm-chat",
+    "title": "Chat",
+    "category": "llm",
+    "metadata": None,
+    "inputs": [
+        {"name": "prompt", "title": "Prompt", "type": "string", "max": 100000},
+        {"name": "system", "title": "System", "type": "string", "optional": True},
+        {"name": "temperature", "title": "Temperature", "type": "number", "min": 0, "max": 2, "default": 1},
+        {"name": "maxTokens", "title": "Max tokens", "type": "integer", "min": 1, "max": 128000, "optional": True},
+        {"name": "model", "title": "Model", "type": "enum", "variants": ["small", "medium", "large"]},
+        {"name": "images", "title": "Images", "type": "list", "elements": {"type": "image"}, "optional": True, "failMode": "any"},
+        {"name": "history", "title": "History", "type": "list", "optional": True, "elements": {
+            "type": "object",
+            "properties": {"role": {"type": "string"}, "content": {"type": "string"}},
+        }},
+        {"name": "embedding", "title": "Embedding", "type": "vector", "size": 8, "optional": True},
+    ],
+    "outputs": [{"name": "text", "title": "Text", "type": "string"}],
+})
+
+PAYLOAD = {
+    "prompt": "Summarise the following text " * 20,
+    "temperature": 0.7,
+    "maxTokens": 512,
+    "model": "medium",
+    "images": [{"url": "https://example.com/a.png"}, None],
+    "history": [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi"}] * 5,
+    "embedding": [0.1] * 8,
+}
+
+def measure(label: str, fn, number: int = 20000) -> None:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"{label:<40} {seconds * 1e6:8.2f} us")
+
+if __name__ == "__main__":
+    assert not NODE.inputs.validator().errors(PAYLOAD)
+    measure("compiled validator (cached)", lambda: NODE.validate_inputs(PAYLOAD))
+    measure("compile + validate (no cache)", lambda: InputsValidator(NODE.inputs.root).errors(PAYLOAD), 2000)
+    measure("to_json_schema (memoised)", lambda: [Type.to_json_schema(i) for i in NODE.inputs.root])
+    measure("to_json_schema (rebuilt)", lambda: [Type._build_json_schema(i) for i in NODE.inputs.root])
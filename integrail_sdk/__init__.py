@@ -1,2 +1,10 @@
-from .api import *
-from .types import *
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from integrail_sdk.helpers.lazy import lazy_exports
+from . import api, types
+
+__all__, __getattr__, __dir__ = lazy_exports(__name__, {"api": api.__all__, "types": types.__all__})
+
+if TYPE_CHECKING:
+    from .api import *
+    from .types import *
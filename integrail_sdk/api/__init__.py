@@ -1,3 +1,66 @@
-from .base import *
-from .cloud import *
-from .common import *
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from integrail_sdk.helpers.lazy import lazy_exports
+
+# See integrail_sdk.types: the HTTP client and the API classes are only imported when first used.
+__all__, __getattr__, __dir__ = lazy_exports(__name__, {
+    "base": ("ApiOptions", "BaseApi", "BaseResponse"),
+    "cache": ("CacheOptions", "CacheStats", "CacheEntry", "ResponseCache"),
+    "coalesce": (
+        "is_append_event", "append_event_key", "merge_append_events", "CoalesceOptions", "coalesce_append_events",
+    ),
+    "execution_cache": (
+        "IGNORED_PAYLOAD_FIELDS", "canonical_hash", "ExecutionCacheOptions", "ExecutionCacheStats", "CachedExecution",
+        "ExecutionCache",
+    ),
+    "errors": (
+        "ApiError", "ApiConnectionError", "ApiTimeoutError", "ApiStatusError", "ApiClientError",
+        "ApiAuthenticationError", "ApiNotFoundError", "ApiRateLimitError", "ApiServerError", "status_error",
+    ),
+    "limits": (
+        "EndpointFamily", "EndpointLimitOptions", "TokenBucket", "AdaptiveConcurrencyLimit",
+        "EndpointLimiter", "LimiterSlot", "RateLimiters",
+    ),
+    "resume": ("FINAL_STATUSES", "DISCONNECT_ERRORS", "ResumeOptions", "StreamPosition", "resume_stream"),
+    "transport": ("PoolOptions", "TimeoutOptions", "RetryPolicy", "IDEMPOTENT_METHODS", "HttpTransport"),
+    "cloud": (
+        "IntegrailCloudApi", "CloudAgentApi", "CloudCategoryApi", "CloudAgentExecuteRequest",
+        "CloudAgentExecuteStreamingRequest", "CloudAgentExecuteNonStreamingRequest",
+        "FINAL_EXECUTION_STATUSES", "ExecutionStatusResponse", "PollOptions", "CloudExecutionApi",
+        "CloudMemoryApi", "MemoryListResponse", "MemoryUploadItem", "MemoryUploadRequest", "BulkProgress",
+        "BulkResult", "INDEX_FILE", "LOCK_FILE", "MirrorSyncResult", "MemoryMirror", "CloudNodeApi",
+    ),
+    "common": (
+        "BaseAgentApi", "BaseAgentExecutionOptions", "AgentExecutionOptionsNonStreaming",
+        "AgentExecutionOptionsStreaming", "AgentExecutionOptions", "NodeDefinitionListResponse",
+        "AgentCategorySchema", "AgentSubcategorySchema", "AgentCategoryListResponse",
+        "BaseNonStreamingRequest", "BaseStreamingRequest", "SingleNodeExecuteRequest",
+        "SingleNodeExecuteStreamingRequest", "SingleNodeExecuteNonStreamingRequest", "AgentExecuteRequest",
+        "AgentExecuteStreamingRequest", "AgentExecuteNonStreamingRequest", "AgentExecuteInlineRequest",
+        "AgentExecuteInlineStreamingRequest", "AgentExecuteInlineNonStreamingRequest",
+        "AgentExecuteNonStreamingResponse", "ExecutionStreamItem", "StreamOverflowPolicy", "ExecutionStream",
+        "EventSubscription",
+    ),
+    # Reachable here through the star imports this package used to do.
+    ".types": (
+        "AgentCategory", "AgentExecution", "AgentExecutionStatus", "AgentSubcategory", "Embedding",
+        "ExecutionEvent", "ExecutionEventOp", "ExecutionReducer", "InitEvent", "InlineAgent", "LiteEvent",
+        "NodeCatalog", "NodeDefinition", "UpdateStatusEvent", "parse_lite_event",
+    ),
+    ".helpers.concurrency": ("BatchResult", "bounded_as_completed"),
+    ".helpers.jsonl": ("iter_jsonl",),
+    ".helpers.upload": ("multipart_form",),
+    ".helpers.vectors": ("EmbeddingMatrix", "require_numpy"),
+})
+
+if TYPE_CHECKING:
+    from .base import *
+    from .cache import *
+    from .coalesce import *
+    from .execution_cache import *
+    from .errors import *
+    from .limits import *
+    from .resume import *
+    from .transport import *
+    from .cloud import *
+    from .common import *
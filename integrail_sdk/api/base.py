@@ -1,41 +1,106 @@
-from pydantic import BaseModel, HttpUrl, Field
-from typing import Any, Optional
+from pydantic import BaseModel, HttpUrl, ConfigDict, Field
+from typing import Any, Callable, Dict, Optional, TypeVar
 import aiohttp
 
+from .cache import CacheOptions, ResponseCache
+from .coalesce import CoalesceOptions
+from .execution_cache import ExecutionCache, ExecutionCacheOptions
+from .limits import EndpointFamily, EndpointLimitOptions
+from .resume import ResumeOptions
+from .transport import HttpTransport, PoolOptions, RetryPolicy, TimeoutOptions
+
 class ApiOptions(BaseModel):
     baseUri: HttpUrl = Field(default="https://cloud.integrail.ai")
     apiToken: str
+    pool: PoolOptions = Field(default_factory=PoolOptions)
+    timeout: TimeoutOptions = Field(default_factory=TimeoutOptions)
+    retry: RetryPolicy = Field(default_factory=RetryPolicy)
+    limits: Dict[EndpointFamily, EndpointLimitOptions] = Field(default_factory=dict)
+    cache: Optional[CacheOptions] = None
+    executionCache: Optional[ExecutionCacheOptions] = None  # Replay finished executions of identical requests.
+    resume: Optional[ResumeOptions] = Field(default_factory=ResumeOptions)  # Re-attach to executions whose stream drops.
+    cancelAbandoned: bool = True  # Cancel an execution on the server when the code streaming it is cancelled.
+    coalesce: Optional[CoalesceOptions] = None  # Merge token events of streaming executions (see CoalesceOptions).
+    singleFlight: bool = False  # Run concurrent identical executions once and share the result (see BaseAgentApi).
+    validateInputs: bool = False  # Check execution inputs against their definitions before sending them.
+
+T = TypeVar("T")
 
 class BaseApi:
-    def __init__(self, params: dict | ApiOptions):
+    def __init__(
+            self,
+            params: dict | ApiOptions,
+            transport: Optional[HttpTransport] = None,
+            cache: Optional[ResponseCache] = None,
+            execution_cache: Optional[ExecutionCache] = None,
+    ):
         if isinstance(params, dict):
             params = ApiOptions(**params)
         self.options = params
+        # Sub-APIs share the transport of the client that created them and leave closing it to that client.
+        self._owns_transport = transport is None
+        self.transport = transport or HttpTransport(self.options.pool, self.options.timeout, self.options.retry, self.options.limits)
+        self.cache = cache or (ResponseCache(self.options.cache) if self.options.cache else None)
+        self.execution_cache = execution_cache or (
+            ExecutionCache(self.options.executionCache) if self.options.executionCache else None)
 
-    async def fetch(self, path: str, init: Optional[dict] = None) -> aiohttp.ClientResponse:
-        # raise ValueError(f"{self.options.baseUri}{path}")
+    async def __aenter__(self) -> 'BaseApi':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
 
+    async def aclose(self) -> None:
+        if self._owns_transport:
+            await self.transport.aclose()
+
+    async def fetch(self, path: str, init: Optional[dict] = None) -> aiohttp.ClientResponse:
         if not init:
             init = {}
-        
+
         method = init.get('method', 'GET')
         json = init.get('json', None)
+        data = init.get('data', None)
         headers = init.get('headers', {})
         headers['Authorization'] = f'Bearer {self.options.apiToken}'
-        # headers = {**(init.get('headers') if init else {}), 'Authorization': f'Bearer {self.options.apiToken}'}
+        extra = {'timeout': init['timeout']} if init.get('timeout') else {}
+        if init.get('allow_statuses'):
+            extra['allow_statuses'] = init['allow_statuses']
 
-        session = aiohttp.ClientSession()
-        # async with aiohttp.ClientSession() as session:
-            # async with session.request(method, f"{self.options.baseUri}{path}", headers=headers, json=json) as response:
-        response = await session.request(method, f"{self.options.baseUri}{path}", headers=headers, json=json)
-        if 200 <= response.status < 300:
-            # raise ValueError(await response.json())
-            return response
-        raise Exception(f"Request failed with status {response.status}")
+        return await self.transport.send(
+            method,
+            f"{self.options.baseUri}{path}",
+            idempotent=init.get('idempotent'),
+            family=init.get('family') or EndpointFamily.of(path),
+            headers=headers,
+            json=json,
+            data=data,
+            **extra,
+        )
 
     async def http_get(self, path: str) -> aiohttp.ClientResponse:
         return await self.fetch(path)
 
+    async def cached_get(
+            self,
+            path: str,
+            parse: Callable[[bytes], T],
+            refresh: bool = False,
+            cache: Optional[ResponseCache] = None,
+    ) -> T:
+        # Goes through the response cache when ApiOptions.cache is set (or `cache` is given); `refresh`
+        # forces a revalidation.
+        cache = cache or self.cache
+        if cache is None:
+            async with await self.http_get(path) as response:
+                return parse(await response.read())
+        return await cache.get(
+            f"{self.options.baseUri}{path}",
+            lambda headers: self.fetch(path, {'headers': headers, 'allow_statuses': (304,)}),
+            parse,
+            refresh,
+        )
+
     async def http_post(self, path: str, body: Any) -> aiohttp.ClientResponse:
         return await self.fetch(path, {
             'method': 'POST',
@@ -49,4 +114,5 @@ class BaseApi:
         })
 
 class BaseResponse(BaseModel):
-    status: str = Field(default="ok")
\ No newline at end of file
+    model_config = ConfigDict(defer_build=True)
+    status: str = Field(default="ok")
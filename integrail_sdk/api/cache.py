@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+from pydantic import BaseModel
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+import aiohttp
+
+T = TypeVar("T")
+
+class CacheOptions(BaseModel):
+    ttl: float = 300.0               # Seconds a response is served without asking the server.
+    directory: Optional[str] = None  # Persist responses here so they survive process restarts.
+
+class CacheStats(BaseModel):
+    hits: int = 0         # Served from the cache without a request.
+    misses: int = 0       # Downloaded and parsed again.
+    revalidated: int = 0  # Server answered 304 Not Modified; the cached value was kept.
+    coalesced: int = 0    # Waited for a refresh another caller had already started.
+
+class CacheEntry:
+    def __init__(self, value: Any, body: bytes, etag: Optional[str], last_modified: Optional[str], stored_at: float):
+        self.value = value
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class ResponseCache:
+    # Caches parsed GET responses for `ttl` seconds. Once an entry expires it is revalidated with the
+    # ETag / Last-Modified of the cached response, so an unchanged resource costs a 304 and no parsing.
+    # Concurrent callers of an expired key share one refresh. With `directory` set, raw bodies are kept
+    # on disk and parsed again after a restart instead of downloaded.
+
+    def __init__(self, options: Optional[CacheOptions] = None):
+        self.options = options or CacheOptions()
+        self.stats = CacheStats()
+        self._directory = os.path.expanduser(self.options.directory) if self.options.directory else None
+        self._entries: Dict[str, CacheEntry] = {}
+        self._refreshing: Dict[str, asyncio.Future] = {}
+
+    async def get(
+            self,
+            key: str,
+            fetch: Callable[[Dict[str, str]], Awaitable[aiohttp.ClientResponse]],
+            parse: Callable[[bytes], T],
+            refresh: bool = False,
+    ) -> T:
+        entry = self._entries.get(key)
+        if entry is not None and not refresh and self._is_fresh(entry):
+            self.stats.hits += 1
+            return entry.value
+        refreshing = self._refreshing.get(key)
+        if refreshing is not None:
+            self.stats.coalesced += 1
+        else:
+            refreshing = asyncio.ensure_future(self._refresh(key, fetch, parse, refresh))
+            self._refreshing[key] = refreshing
+            refreshing.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        # Shielded so that a caller giving up does not cancel the refresh the others are waiting for.
+        return await asyncio.shield(refreshing)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        # Without a key only the entries this process knows about are dropped, on disk as well.
+        keys = list(self._entries) if key is None else [key]
+        for cached_key in keys:
+            self._entries.pop(cached_key, None)
+            if self._directory:
+                try:
+                    os.remove(self._path(cached_key))
+                except FileNotFoundError:
+                    pass
+
+    async def _refresh(
+            self,
+            key: str,
+            fetch: Callable[[Dict[str, str]], Awaitable[aiohttp.ClientResponse]],
+            parse: Callable[[bytes], T],
+            refresh: bool,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        entry = self._entries.get(key)
+        if entry is None and self._directory:
+            entry = await loop.run_in_executor(None, self._load, key, parse)
+            if entry is not None:
+                self._entries[key] = entry
+                if not refresh and self._is_fresh(entry):
+                    self.stats.hits += 1
+                    return entry.value
+        async with await fetch(entry.validators() if entry is not None else {}) as response:
+            if response.status == 304 and entry is not None:
+                self.stats.revalidated += 1
+                entry = CacheEntry(entry.value, entry.body, response.headers.get("ETag") or entry.etag,
+                                   response.headers.get("Last-Modified") or entry.last_modified, time.time())
+            else:
+                self.stats.misses += 1
+                body = await response.read()
+                entry = CacheEntry(parse(body), body, response.headers.get("ETag"),
+                                   response.headers.get("Last-Modified"), time.time())
+        self._entries[key] = entry
+        if self._directory:
+            await loop.run_in_executor(None, self._store, key, entry)
+        return entry.value
+
+    def _is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.stored_at < self.options.ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, hashlib.sha256(key.encode()).hexdigest() + ".cache")
+
+    def _load(self, key: str, parse: Callable[[bytes], T]) -> Optional[CacheEntry]:
+        # File layout: one JSON header line with the validators, followed by the raw response body.
+        try:
+            with open(self._path(key), "rb") as file:
+                header = json.loads(file.readline())
+                body = file.read()
+        except (OSError, ValueError):
+            return None
+        if header.get("key") != key:
+            return None
+        try:
+            value = parse(body)
+        except ValueError:
+            return None
+        return CacheEntry(value, body, header.get("etag"), header.get("lastModified"), header.get("storedAt", 0.0))
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(key)
+        header = {"key": key, "etag": entry.etag, "lastModified": entry.last_modified, "storedAt": entry.stored_at}
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(json.dumps(header).encode() + b"\n")
+            file.write(entry.body)
+        os.replace(temporary, path)
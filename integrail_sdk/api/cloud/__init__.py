@@ -1,12 +1,20 @@
+from integrail_sdk.api.base import ApiOptions, BaseApi
 from .agent import *
 from .execution import *
 from .memory import *
+from .memory_mirror import *
 from .node import *
 
 class IntegrailCloudApi(BaseApi):
-    def __init__(self, options: dict):
+    def __init__(self, options: dict | ApiOptions):
         super().__init__(options)
-        self.agent = CloudAgentApi(self.options)
-        self.node = CloudNodeApi(self.options)
-        self.category = CloudCategoryApi(self.options)
-        self.memory = CloudMemoryApi(self.options)
\ No newline at end of file
+        self.agent = CloudAgentApi(self.options, self.transport, self.cache, self.execution_cache)
+        self.node = CloudNodeApi(self.options, self.transport, self.cache, self.execution_cache)
+        self.category = CloudCategoryApi(self.options, self.transport, self.cache, self.execution_cache)
+        self.memory = CloudMemoryApi(self.options, self.transport, self.cache, self.execution_cache)
+        self.execution = CloudExecutionApi(self.options, self.transport, self.cache, self.execution_cache)
+
+    async def aclose(self) -> None:
+        await self.agent.aclose()
+        await self.node.aclose()
+        await super().aclose()
@@ -1,14 +1,19 @@
-from pydantic import BaseModel
-from typing import Any, Dict, Optional, Union, Callable
-import aiohttp
+from pydantic import BaseModel, ConfigDict
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Union, Callable
 
 from integrail_sdk.types.execution import AgentExecution, ExecutionEvent
 from integrail_sdk.api.base import BaseApi
+from integrail_sdk.api.coalesce import CoalesceOptions
 from integrail_sdk.api.common.agent import (
     AgentCategoryListResponse,
     AgentExecuteNonStreamingResponse,
     BaseAgentApi,
 )
+from integrail_sdk.api.common.stream import ExecutionStream, StreamOverflowPolicy
+from integrail_sdk.api.common.subscription import EventSubscription
+from integrail_sdk.helpers.concurrency import BatchResult, bounded_as_completed
+from integrail_sdk.helpers.fast_json import loads
+from integrail_sdk.helpers.upload import ProgressCallback
 
 class CloudAgentApi(BaseAgentApi):
     @property
@@ -22,12 +27,23 @@ class CloudAgentApi(BaseAgentApi):
         payload: 'CloudAgentExecuteRequest',
         on_event: Optional[Callable[[ExecutionEvent, Optional[AgentExecution]], Any]] = None,
         on_finish: Optional[Callable[[Optional[AgentExecution]], Any]] = None,
-    ) -> Union[AgentExecuteNonStreamingResponse, aiohttp.ClientTimeout]:
+        subscription: Optional[EventSubscription] = None,
+        lite: bool = False,
+        use_cache: bool = True,
+        cache_version: Optional[str] = None,
+        coalesce: Optional[CoalesceOptions] = None,
+    ) -> Union[AgentExecuteNonStreamingResponse, AgentExecution]:
+        # `cache_version` separates cache entries of different versions of the agent (see ApiOptions.executionCache).
         return await self.wrap_execution(
             f"api/{account_id}/agent/{agent_id}/execute",
             payload.model_dump(by_alias=True),
             on_event,
             on_finish,
+            subscription,
+            lite,
+            use_cache,
+            cache_version,
+            coalesce,
         )
 
     async def execute_multipart(
@@ -38,21 +54,75 @@ class CloudAgentApi(BaseAgentApi):
         files: Dict[str, Any],
         on_event: Optional[Callable[[ExecutionEvent, Optional[AgentExecution]], Any]] = None,
         on_finish: Optional[Callable[[Optional[AgentExecution]], Any]] = None,
-    ) -> Union[AgentExecuteNonStreamingResponse, aiohttp.ClientTimeout]:
+        subscription: Optional[EventSubscription] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        lite: bool = False,
+        coalesce: Optional[CoalesceOptions] = None,
+    ) -> Union[AgentExecuteNonStreamingResponse, AgentExecution]:
         return await self.wrap_execution_multipart(
             f"api/{account_id}/agent/{agent_id}/execute/multipart",
             payload.model_dump(by_alias=True),
             files,
             on_event,
             on_finish,
+            subscription,
+            on_progress,
+            lite,
+            coalesce,
         )
 
+    def stream(
+        self,
+        agent_id: str,
+        account_id: str,
+        payload: 'CloudAgentExecuteRequest',
+        max_queue: int = 256,
+        overflow: StreamOverflowPolicy = StreamOverflowPolicy.BLOCK,
+        subscription: Optional[EventSubscription] = None,
+        lite: bool = False,
+        coalesce: Optional[CoalesceOptions] = None,
+    ) -> ExecutionStream:
+        return self.stream_execution(
+            f"api/{account_id}/agent/{agent_id}/execute",
+            payload.model_dump(by_alias=True),
+            max_queue,
+            overflow,
+            subscription,
+            lite,
+            coalesce,
+        )
+
+    async def execute_many(
+        self,
+        agent_id: str,
+        account_id: str,
+        inputs: Union[Iterable[Union[Dict[str, Any], 'CloudAgentExecuteRequest']], AsyncIterable[Union[Dict[str, Any], 'CloudAgentExecuteRequest']]],
+        concurrency: int = 8,
+    ) -> AsyncIterator[BatchResult]:
+        # Plain input dicts are executed as streaming requests, so each result is the final AgentExecution.
+        # The events themselves are discarded, so token events are not validated.
+        async def execute_one(item: Union[Dict[str, Any], CloudAgentExecuteRequest]):
+            payload = item if isinstance(item, CloudAgentExecuteRequest) else CloudAgentExecuteStreamingRequest(inputs=item)
+            on_event = CloudAgentApi._ignore_event if payload.stream else None
+            return await self.execute(agent_id, account_id, payload, on_event, lite=True)
+
+        async for result in bounded_as_completed(inputs, execute_one, concurrency):
+            yield result
+
+    @staticmethod
+    async def _ignore_event(event: ExecutionEvent, execution: Optional[AgentExecution]) -> None:
+        pass
+
 class CloudCategoryApi(BaseApi):
-    async def list(self) -> AgentCategoryListResponse:
-        response = await self.http_get("api/node/category/list")
-        return AgentCategoryListResponse.model_validate(await response.json())
+    async def list(self, refresh: bool = False) -> AgentCategoryListResponse:
+        return await self.cached_get("api/node/category/list", CloudCategoryApi._parse_list, refresh)
+
+    @staticmethod
+    def _parse_list(body: bytes) -> AgentCategoryListResponse:
+        return AgentCategoryListResponse.model_validate(loads(body))
 
 class CloudAgentExecuteRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     inputs: Dict[str, Any]
     stream: Optional[bool] = None
     externalId: Optional[str] = None
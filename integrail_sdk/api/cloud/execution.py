@@ -1,5 +1,150 @@
-from integrail_sdk.types import AgentExecution
-from integrail_sdk.api.base import BaseResponse
+import asyncio
+import heapq
+
+from pydantic import BaseModel, ConfigDict
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from integrail_sdk.types import AgentExecution, AgentExecutionStatus
+from integrail_sdk.api.base import BaseApi, BaseResponse
+from integrail_sdk.api.errors import ApiTimeoutError
+from integrail_sdk.helpers.concurrency import BatchResult, bounded_as_completed
+from integrail_sdk.helpers.fast_json import loads
+
+FINAL_EXECUTION_STATUSES = frozenset({AgentExecutionStatus.FINISHED, AgentExecutionStatus.CANCELLED, AgentExecutionStatus.ERROR})
 
 class ExecutionStatusResponse(BaseResponse):
-    execution: AgentExecution
\ No newline at end of file
+    execution: AgentExecution
+
+class PollOptions(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    initialInterval: float = 0.25
+    maxInterval: float = 5.0
+    backoff: float = 1.5
+
+class CloudExecutionApi(BaseApi):
+    async def get(self, account_id: str, execution_id: str) -> ExecutionStatusResponse:
+        return CloudExecutionApi._to_response(await self._get_raw(account_id, execution_id))
+
+    async def get_status(self, account_id: str, execution_id: str) -> AgentExecutionStatus:
+        # Reads only the status out of the response instead of validating the whole execution.
+        return CloudExecutionApi._status_of(await self._get_raw(account_id, execution_id))
+
+    async def cancel(self, account_id: str, execution_id: str) -> BaseResponse:
+        # Asks the server to stop the execution; it goes through `cancelling` to `cancelled`, which wait() reports.
+        response = await self.fetch(f"api/{account_id}/execution/{execution_id}/cancel", {'method': 'POST', 'idempotent': True})
+        async with response:
+            body = await response.read()
+        return BaseResponse.model_validate(loads(body) if body.strip() else {})
+
+    async def cancel_many(
+        self,
+        account_id: str,
+        execution_ids: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: int = 8,
+    ) -> AsyncIterator[BatchResult]:
+        # For batches started with agent.execute_many or non-streaming executes; results are yielded as
+        # the requests complete, with `index` pointing into execution_ids.
+        async for result in bounded_as_completed(execution_ids, lambda execution_id: self.cancel(account_id, execution_id), concurrency):
+            yield result
+
+    async def wait(
+        self,
+        account_id: str,
+        execution_id: str,
+        status_only: bool = False,
+        timeout: Optional[float] = None,
+        poll: Optional[PollOptions] = None,
+    ) -> Union[AgentExecution, AgentExecutionStatus]:
+        results = self.wait_many(account_id, [execution_id], 1, status_only, timeout, poll)
+        try:
+            result = await results.__anext__()
+        finally:
+            await results.aclose()
+        if result.error is not None:
+            raise result.error
+        return result.result
+
+    async def wait_many(
+        self,
+        account_id: str,
+        execution_ids: Iterable[str],
+        concurrency: int = 4,
+        status_only: bool = False,
+        timeout: Optional[float] = None,
+        poll: Optional[PollOptions] = None,
+    ) -> AsyncIterator[BatchResult]:
+        # Polls all executions from `concurrency` coroutines sharing one schedule ordered by next poll time.
+        # Each execution starts at poll.initialInterval and backs off towards poll.maxInterval, so thousands
+        # of long-running executions cost a handful of requests per second. Results are yielded as
+        # executions end, with `index` pointing into execution_ids.
+        poll = poll or PollOptions()
+        ids = list(execution_ids)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        schedule: List[Tuple[float, int, float]] = [(loop.time(), index, poll.initialInterval) for index in range(len(ids))]
+        results: asyncio.Queue = asyncio.Queue()
+        pushed = asyncio.Event()
+        in_flight = 0
+
+        async def worker() -> None:
+            nonlocal in_flight
+            while True:
+                if not schedule:
+                    if in_flight == 0:
+                        return
+                    pushed.clear()
+                    await pushed.wait()
+                    continue
+                delay = schedule[0][0] - loop.time()
+                if delay > 0:
+                    pushed.clear()
+                    try:
+                        await asyncio.wait_for(pushed.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                _, index, interval = heapq.heappop(schedule)
+                in_flight += 1
+                try:
+                    data = await self._get_raw(account_id, ids[index])
+                    status = CloudExecutionApi._status_of(data)
+                    if status in FINAL_EXECUTION_STATUSES:
+                        results.put_nowait(BatchResult(index, status if status_only else CloudExecutionApi._to_response(data).execution))
+                    elif deadline is not None and loop.time() + interval > deadline:
+                        results.put_nowait(BatchResult(index, error=ApiTimeoutError(f"Execution {ids[index]} did not end within {timeout}s")))
+                    else:
+                        heapq.heappush(schedule, (loop.time() + interval, index, min(poll.maxInterval, interval * poll.backoff)))
+                except Exception as e:
+                    results.put_nowait(BatchResult(index, error=e))
+                finally:
+                    in_flight -= 1
+                    pushed.set()
+
+        workers = asyncio.ensure_future(asyncio.gather(*[worker() for _ in range(max(1, min(concurrency, len(ids))))]))
+        try:
+            # Workers report every failure through `results`, so exactly one result arrives per execution.
+            for _ in range(len(ids)):
+                yield await results.get()
+        finally:
+            workers.cancel()
+            try:
+                await workers
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _get_raw(self, account_id: str, execution_id: str) -> Dict[str, Any]:
+        response = await self.http_get(f"api/{account_id}/execution/{execution_id}")
+        async with response:
+            body = await response.read()
+        return loads(body)
+
+    @staticmethod
+    def _status_of(data: Dict[str, Any]) -> AgentExecutionStatus:
+        return AgentExecutionStatus(data["execution"]["status"])
+
+    @staticmethod
+    def _to_response(data: Dict[str, Any]) -> ExecutionStatusResponse:
+        return ExecutionStatusResponse(
+            status=data.get("status", "ok"),
+            execution=AgentExecution.validate_lazy(data["execution"]),
+        )
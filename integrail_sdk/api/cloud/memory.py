@@ -1,8 +1,17 @@
-from pydantic import BaseModel
-from typing import List, Optional
+import asyncio
+import hashlib
+import inspect
+
+from pydantic import BaseModel, ConfigDict
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Union
 
 from integrail_sdk.api.base import BaseApi, BaseResponse
+from integrail_sdk.api.errors import ApiNotFoundError
 from integrail_sdk.types.embedding import Embedding
+from integrail_sdk.helpers.concurrency import BatchResult, aiterate, bounded_as_completed
+from integrail_sdk.helpers.fast_json import loads
+from integrail_sdk.helpers.vectors import EmbeddingMatrix, require_numpy
+from .memory_mirror import MemoryMirror
 
 class CloudMemoryApi(BaseApi):
     async def list(self, account_id: str, store_id: str) -> 'MemoryListResponse':
@@ -10,18 +19,184 @@ class CloudMemoryApi(BaseApi):
         json_data = await response.json()
         return MemoryListResponse.model_validate(json_data)
 
+    async def load_matrix(self, account_id: str, store_id: str) -> EmbeddingMatrix:
+        # Same request as list(), but the embeddings go into a float32 array instead of Embedding models.
+        # Decoding a large store takes a while, so it runs off the event loop.
+        require_numpy()
+        async with await self.http_get(f"api/{account_id}/memory/{store_id}") as response:
+            body = await response.read()
+        return await asyncio.get_running_loop().run_in_executor(None, CloudMemoryApi._parse_matrix, body)
+
+    def mirror(self, account_id: str, store_id: str, directory: str) -> MemoryMirror:
+        return MemoryMirror(self, account_id, store_id, directory)
+
     async def upload(self, account_id: str, store_id: str, payload: 'MemoryUploadRequest') -> None:
-        await self.http_post(f"api/{account_id}/memory/{store_id}", payload.model_dump(by_alias=True))
+        response = await self.http_post(f"api/{account_id}/memory/{store_id}", payload.model_dump(by_alias=True))
+        response.release()
 
     async def delete(self, account_id: str, store_id: str, item_id: str) -> None:
-        await self.http_delete(f"api/{account_id}/memory/{store_id}/{item_id}")
+        response = await self.http_delete(f"api/{account_id}/memory/{store_id}/{item_id}")
+        response.release()
+
+    async def bulk_upload(
+        self,
+        account_id: str,
+        store_id: str,
+        items: Union[Iterable[Union['MemoryUploadItem', Dict[str, Any]]], AsyncIterable[Union['MemoryUploadItem', Dict[str, Any]]]],
+        batch_size: int = 100,
+        batch_bytes: int = 1024 * 1024,
+        concurrency: int = 4,
+        skip_existing: bool = False,
+        retry: bool = False,
+        on_progress: Optional[Callable[['BulkProgress'], Any]] = None,
+    ) -> 'BulkResult':
+        # Reads items lazily, groups them into batches of at most `batch_size` items and roughly `batch_bytes`
+        # of text, and uploads up to `concurrency` batches at a time. Items earlier in `items` with the same
+        # text are skipped, and so are items already in the store with `skip_existing`, which downloads the
+        # whole store (embeddings included) first. An upload is not idempotent, so batches are only retried
+        # when the server never got them (connection refused, 429); `retry` retries them like an idempotent
+        # request, at the risk of storing a batch twice when its response got lost. Failed batches are
+        # returned in `errors` with their items as `result`. Skipping duplicates keeps the 32-byte hash of every
+        # distinct text seen, about 100 bytes each in memory (100 MB per million items), and of every stored
+        # item with `skip_existing`.
+        path = f"api/{account_id}/memory/{store_id}"
+        seen = await self._content_hashes(account_id, store_id) if skip_existing else set()
+        in_flight: Dict[int, List[MemoryUploadItem]] = {}
+        skipped = 0
+
+        async def batches() -> AsyncIterator[List[MemoryUploadItem]]:
+            nonlocal skipped
+            batch: List[MemoryUploadItem] = []
+            size = index = 0
+            async for item in aiterate(items):
+                if not isinstance(item, MemoryUploadItem):
+                    item = MemoryUploadItem.model_validate(item)
+                key = CloudMemoryApi._content_hash(item.input, item.inputFull)
+                if key in seen:
+                    skipped += 1
+                    continue
+                seen.add(key)
+                item_size = len(item.input.encode()) + len(item.inputFull.encode() if item.inputFull else b"")
+                if batch and (len(batch) >= batch_size or size + item_size > batch_bytes):
+                    in_flight[index] = batch
+                    index += 1
+                    yield batch
+                    batch, size = [], 0
+                batch.append(item)
+                size += item_size
+            if batch:
+                in_flight[index] = batch
+                yield batch
+
+        async def upload_batch(batch: List[MemoryUploadItem]) -> int:
+            async with await self.fetch(path, {
+                'method': 'POST',
+                'json': MemoryUploadRequest(items=batch).model_dump(by_alias=True),
+                'idempotent': retry,
+            }):
+                return len(batch)
+
+        done = failed = 0
+        errors: List[BatchResult] = []
+        async for result in bounded_as_completed(batches(), upload_batch, concurrency):
+            batch = in_flight.pop(result.index)
+            if result.error is not None:
+                failed += len(batch)
+                errors.append(BatchResult(result.index, batch, result.error))
+            else:
+                done += result.result
+            await CloudMemoryApi._report(on_progress, BulkProgress(done, skipped, failed))
+        return BulkResult(done, skipped, failed, errors)
+
+    async def bulk_delete(
+        self,
+        account_id: str,
+        store_id: str,
+        item_ids: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: int = 8,
+        on_progress: Optional[Callable[['BulkProgress'], Any]] = None,
+    ) -> 'BulkResult':
+        # Items that are already gone count as skipped. Failed deletions are returned in `errors` with the
+        # item id as `result`.
+        pending: Dict[int, str] = {}
+
+        async def ids() -> AsyncIterator[str]:
+            index = 0
+            async for item_id in aiterate(item_ids):
+                pending[index] = item_id
+                index += 1
+                yield item_id
+
+        async def delete_one(item_id: str) -> bool:
+            try:
+                await self.delete(account_id, store_id, item_id)
+            except ApiNotFoundError:
+                return False
+            return True
+
+        done = skipped = failed = 0
+        errors: List[BatchResult] = []
+        async for result in bounded_as_completed(ids(), delete_one, concurrency):
+            item_id = pending.pop(result.index)
+            if result.error is not None:
+                failed += 1
+                errors.append(BatchResult(result.index, item_id, result.error))
+            elif result.result:
+                done += 1
+            else:
+                skipped += 1
+            await CloudMemoryApi._report(on_progress, BulkProgress(done, skipped, failed))
+        return BulkResult(done, skipped, failed, errors)
+
+    async def _content_hashes(self, account_id: str, store_id: str) -> Set[bytes]:
+        async with await self.http_get(f"api/{account_id}/memory/{store_id}") as response:
+            body = await response.read()
+        return await asyncio.get_running_loop().run_in_executor(None, CloudMemoryApi._parse_content_hashes, body)
+
+    @staticmethod
+    def _parse_content_hashes(body: bytes) -> Set[bytes]:
+        return {
+            CloudMemoryApi._content_hash(item.get("embeddedDescription", ""), item.get("fullDescription"))
+            for item in loads(body)["items"]
+        }
+
+    @staticmethod
+    def _content_hash(text: str, full_text: Optional[str]) -> bytes:
+        # An upload without inputFull and a stored item whose full text repeats the embedded one are the same.
+        if full_text == text:
+            full_text = None
+        return hashlib.sha256(f"{text}\0{full_text or ''}".encode()).digest()
+
+    @staticmethod
+    async def _report(on_progress: Optional[Callable[['BulkProgress'], Any]], progress: 'BulkProgress') -> None:
+        if on_progress is not None:
+            result = on_progress(progress)
+            if inspect.isawaitable(result):
+                await result
+
+    @staticmethod
+    def _parse_matrix(body: bytes) -> EmbeddingMatrix:
+        return EmbeddingMatrix.from_items(loads(body)["items"])
 
 class MemoryListResponse(BaseResponse):
     items: List[Embedding]
 
 class MemoryUploadItem(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     input: str
     inputFull: Optional[str] = None
 
 class MemoryUploadRequest(BaseModel):
-    items: List[MemoryUploadItem]
\ No newline at end of file
+    model_config = ConfigDict(defer_build=True)
+    items: List[MemoryUploadItem]
+
+class BulkProgress(NamedTuple):
+    done: int
+    skipped: int
+    failed: int
+
+class BulkResult(NamedTuple):
+    done: int
+    skipped: int
+    failed: int
+    errors: List[BatchResult]
\ No newline at end of file
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+import time
+
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional
+
+from integrail_sdk.helpers.fast_json import loads
+from integrail_sdk.helpers.vectors import EmbeddingMatrix, require_numpy
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+if TYPE_CHECKING:
+    from .memory import CloudMemoryApi
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "sync.lock"
+
+class MirrorSyncResult(NamedTuple):
+    added: int
+    removed: int
+    total: int
+    unchanged: bool = False  # The server answered 304, nothing was downloaded.
+    compacted: bool = False  # The vector file was rewritten without deleted rows.
+
+class MemoryMirror:
+    # Local copy of a memory store: embeddings in a flat float32 file that readers memory-map read-only,
+    # so every worker process on the machine shares the same pages, and ids/texts/sync state in a JSON
+    # sidecar. The vector file is append-only between compactions and the sidecar is replaced atomically,
+    # so readers never see a half-written state. Deleted items are only marked in the sidecar until they
+    # make up `compact_ratio` of the rows; compaction writes a new vector file rather than rewriting the
+    # one other processes may have mapped.
+
+    def __init__(self, api: 'CloudMemoryApi', account_id: str, store_id: str, directory: str, compact_ratio: float = 0.25):
+        self.api = api
+        self.account_id = account_id
+        self.store_id = store_id
+        self.directory = os.path.expanduser(directory)
+        self.compact_ratio = compact_ratio
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.directory, INDEX_FILE))
+
+    def load(self) -> EmbeddingMatrix:
+        # Maps the last synced state; no request is made.
+        numpy = require_numpy()
+        index = self._read_index()
+        if index is None:
+            raise FileNotFoundError(f"No mirror of memory store {self.store_id} in {self.directory}; call sync() first")
+        rows, dim = len(index["ids"]), index["dim"]
+        if rows and dim:
+            vectors = numpy.memmap(os.path.join(self.directory, index["file"]), dtype=numpy.float32, mode="r", shape=(rows, dim))
+        else:
+            vectors = numpy.empty((rows, dim), dtype=numpy.float32)
+        return EmbeddingMatrix(index["ids"], index["texts"], index["fullTexts"], vectors, index["deleted"])
+
+    async def sync(self, full: bool = False) -> MirrorSyncResult:
+        # Revalidates the store with the ETag / Last-Modified of the previous sync and, if it changed, diffs
+        # the listed items against the mirror by `_id`: only new embeddings are written, removed ones are
+        # marked deleted. `full` ignores the previous state and rebuilds the mirror from scratch.
+        require_numpy()
+        os.makedirs(self.directory, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        lock = await loop.run_in_executor(None, self._lock)
+        try:
+            previous = await loop.run_in_executor(None, self._read_index)
+            index = None if full else previous
+            headers = {}
+            if index is not None:
+                if index.get("etag"):
+                    headers["If-None-Match"] = index["etag"]
+                if index.get("lastModified"):
+                    headers["If-Modified-Since"] = index["lastModified"]
+            path = f"api/{self.account_id}/memory/{self.store_id}"
+            async with await self.api.fetch(path, {'headers': headers, 'allow_statuses': (304,)}) as response:
+                if response.status == 304 and index is not None:
+                    live = len(index["ids"]) - len(index["deleted"])
+                    return MirrorSyncResult(0, 0, live, unchanged=True)
+                body = await response.read()
+                validators = {"etag": response.headers.get("ETag"), "lastModified": response.headers.get("Last-Modified")}
+            return await loop.run_in_executor(None, self._apply, previous, index, body, validators)
+        finally:
+            if lock is not None:
+                lock.close()
+
+    def _apply(
+            self,
+            previous: Optional[Dict[str, Any]],
+            index: Optional[Dict[str, Any]],
+            body: bytes,
+            validators: Dict[str, Any],
+    ) -> MirrorSyncResult:
+        numpy = require_numpy()
+        items: List[Dict[str, Any]] = loads(body)["items"]
+        dim = len(items[0]["embedding"]) if items else (index["dim"] if index else 0)
+        if index is None or index["dim"] != dim:
+            # First or full sync, or the store was re-embedded with another model: start over in a new file,
+            # since other processes may still map the current one.
+            index = {
+                "file": None,
+                "generation": previous["generation"] if previous else 0,
+                "dim": dim,
+                "ids": [],
+                "texts": [],
+                "fullTexts": [],
+                "deleted": [],
+                "previousFile": previous["file"] if previous else None,
+            }
+        deleted = set(index["deleted"])
+        known = {item_id: row for row, item_id in enumerate(index["ids"]) if row not in deleted}
+        listed = {item["_id"] for item in items}
+        removed = [row for item_id, row in known.items() if item_id not in listed]
+        added = [item for item in items if item["_id"] not in known]
+        deleted.update(removed)
+
+        if index["file"] is not None and len(deleted) > self.compact_ratio * (len(index["ids"]) + len(added)):
+            index = self._compact(index, deleted)
+            deleted = set()
+            compacted = True
+        else:
+            compacted = False
+        if index["file"] is None:
+            index["generation"] += 1
+            index["file"] = f"vectors-{index['generation']}.f32"
+        if added:
+            vectors = numpy.empty((len(added), dim), dtype=numpy.float32)
+            for row, item in enumerate(added):
+                embedding = item.pop("embedding")
+                if len(embedding) != dim:
+                    raise ValueError(f"Embedding of item {item['_id']} has {len(embedding)} dimensions, expected {dim}")
+                vectors[row] = embedding
+            with open(os.path.join(self.directory, index["file"]), "ab") as file:
+                # Drop rows a crashed sync may have appended without recording them in the index.
+                file.truncate(len(index["ids"]) * dim * 4)
+                file.write(vectors.tobytes())
+            index["ids"] += [item["_id"] for item in added]
+            index["texts"] += [item.get("embeddedDescription", "") for item in added]
+            index["fullTexts"] += [item.get("fullDescription", "") for item in added]
+        else:
+            open(os.path.join(self.directory, index["file"]), "ab").close()
+        index["deleted"] = sorted(deleted)
+        index.update(validators, syncedAt=time.time())
+        self._write_index(index)
+        return MirrorSyncResult(len(added), len(removed), len(index["ids"]) - len(deleted), compacted=compacted)
+
+    def _compact(self, index: Dict[str, Any], deleted: set) -> Dict[str, Any]:
+        numpy = require_numpy()
+        keep = [row for row in range(len(index["ids"])) if row not in deleted]
+        generation = index["generation"] + 1
+        file_name = f"vectors-{generation}.f32"
+        rows, dim = len(index["ids"]), index["dim"]
+        if rows and dim:
+            source = numpy.memmap(os.path.join(self.directory, index["file"]), dtype=numpy.float32, mode="r", shape=(rows, dim))
+            with open(os.path.join(self.directory, file_name), "wb") as file:
+                for start in range(0, len(keep), 4096):
+                    file.write(numpy.ascontiguousarray(source[keep[start:start + 4096]]).tobytes())
+            del source
+        else:
+            open(os.path.join(self.directory, file_name), "wb").close()
+        return {
+            **index,
+            "file": file_name,
+            "generation": generation,
+            "ids": [index["ids"][row] for row in keep],
+            "texts": [index["texts"][row] for row in keep],
+            "fullTexts": [index["fullTexts"][row] for row in keep],
+            "deleted": [],
+            "previousFile": index["file"],
+        }
+
+    def _read_index(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), "rb") as file:
+                return loads(file.read())
+        except FileNotFoundError:
+            return None
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        previous_file = index.pop("previousFile", None)
+        path = os.path.join(self.directory, INDEX_FILE)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(index, file)
+        os.replace(temporary, path)
+        if previous_file:
+            # Processes that still map the old file keep their pages until they unmap it.
+            os.remove(os.path.join(self.directory, previous_file))
+
+    def _lock(self) -> Any:
+        # Serialises syncs of the same mirror across processes; readers never lock.
+        if fcntl is None:
+            return None
+        file = open(os.path.join(self.directory, LOCK_FILE), "w")
+        fcntl.flock(file, fcntl.LOCK_EX)
+        return file
@@ -1,23 +1,70 @@
-from typing import Any, Optional, Union, Callable
-import aiohttp
+from typing import Any, Dict, Optional, Union, Callable
 
 from integrail_sdk.types import ExecutionEvent, AgentExecution
+from integrail_sdk.api.cache import ResponseCache
+from integrail_sdk.api.coalesce import CoalesceOptions
 from integrail_sdk.api.common.agent import (
     BaseAgentApi,
     NodeDefinitionListResponse,
     AgentExecuteNonStreamingResponse,
     SingleNodeExecuteRequest,
 )
+from integrail_sdk.api.common.stream import ExecutionStream, StreamOverflowPolicy
+from integrail_sdk.api.common.subscription import EventSubscription
+from integrail_sdk.helpers.fast_json import loads
 
 class CloudNodeApi(BaseAgentApi):
-    async def list(self) -> NodeDefinitionListResponse:
-        response = await self.http_get("api/node/list")
-        return NodeDefinitionListResponse.model_validate(await response.json(), strict=False)
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # validateInputs looks nodes up in the node list; without ApiOptions.cache it keeps that list in a
+        # cache of its own, so executions do not download it every time.
+        self._definitions = self.cache or (ResponseCache() if self.options.validateInputs else None)
+
+    async def list(self, refresh: bool = False) -> NodeDefinitionListResponse:
+        return await self.cached_get("api/node/list", CloudNodeApi._parse_list, refresh)
 
     async def execute(
         self,
         payload: SingleNodeExecuteRequest,
         on_event: Optional[Callable[[ExecutionEvent, Optional[AgentExecution]], Any]] = None,
         on_finish: Optional[Callable[[Optional[AgentExecution]], Any]] = None,
-    ) -> Union[AgentExecuteNonStreamingResponse, aiohttp.ClientTimeout]:
-        return await self.wrap_execution("api/node/execute", payload.model_dump(by_alias=True), on_event, on_finish)
\ No newline at end of file
+        subscription: Optional[EventSubscription] = None,
+        lite: bool = False,
+        use_cache: bool = True,
+        cache_version: Optional[str] = None,
+        coalesce: Optional[CoalesceOptions] = None,
+    ) -> Union[AgentExecuteNonStreamingResponse, AgentExecution]:
+        return await self.wrap_execution(
+            "api/node/execute",
+            payload.model_dump(by_alias=True),
+            on_event,
+            on_finish,
+            subscription,
+            lite,
+            use_cache,
+            cache_version,
+            coalesce,
+        )
+
+    def stream(
+        self,
+        payload: SingleNodeExecuteRequest,
+        max_queue: int = 256,
+        overflow: StreamOverflowPolicy = StreamOverflowPolicy.BLOCK,
+        subscription: Optional[EventSubscription] = None,
+        lite: bool = False,
+        coalesce: Optional[CoalesceOptions] = None,
+    ) -> ExecutionStream:
+        return self.stream_execution(
+            "api/node/execute", payload.model_dump(by_alias=True), max_queue, overflow, subscription, lite, coalesce)
+
+    async def before_execute(self, payload: Dict[str, Any]) -> None:
+        if self.options.validateInputs:
+            definitions = await self.cached_get("api/node/list", CloudNodeApi._parse_list, cache=self._definitions)
+            node = definitions.catalog().get(payload["nodeName"])
+            if node is not None:
+                node.validate_inputs(payload.get("inputs") or {})
+
+    @staticmethod
+    def _parse_list(body: bytes) -> NodeDefinitionListResponse:
+        return NodeDefinitionListResponse.model_validate(loads(body), strict=False)
\ No newline at end of file
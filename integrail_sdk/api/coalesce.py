@@ -0,0 +1,110 @@
+import asyncio
+
+from collections import OrderedDict
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, Optional, Tuple, Union
+
+from integrail_sdk.types import ExecutionEvent, ExecutionEventOp, LiteEvent
+
+# Events read from the source ahead of the coalescing loop.
+READ_AHEAD = 64
+
+def is_append_event(event: ExecutionEvent) -> bool:
+    return event.root.op in (ExecutionEventOp.OUTPUT_UPDATE, ExecutionEventOp.NODE_OUTPUT_UPDATE) and bool(event.root.append)
+
+def append_event_key(event: ExecutionEvent) -> Tuple[Any, ...]:
+    return event.root.op, getattr(event.root, "nodeId", None), event.root.output
+
+def merge_append_events(first: ExecutionEvent, second: ExecutionEvent) -> ExecutionEvent:
+    if isinstance(second, LiteEvent):
+        return second.merged(f"{first.root.value}{second.value}")
+    merged = second.root.model_copy(update={"value": f"{first.root.value}{second.root.value}"})
+    return ExecutionEvent.model_construct(root=merged)
+
+class CoalesceOptions(BaseModel):
+    window: float = 0.05   # Seconds token events of one output are held back to be merged; 0 disables merging.
+    maxChars: int = 1024   # A merged event is passed on as soon as its text reaches this size.
+
+async def coalesce_append_events(
+        events: AsyncIterator[Union[ExecutionEvent, LiteEvent]],
+        options: CoalesceOptions,
+) -> AsyncIterator[Union[ExecutionEvent, LiteEvent]]:
+    # Merges token (append) events per node and output: each group is passed on `window` seconds after its
+    # first event, once it reaches maxChars, or right before the next event that is not a token event,
+    # so status events keep their place in the stream. Downstream then sees at most one token event per
+    # output and window, however fast the model is.
+    if options.window <= 0:
+        async for event in events:
+            yield event
+        return
+    loop = asyncio.get_running_loop()
+    pending: 'OrderedDict[Tuple[Any, ...], Any]' = OrderedDict()  # key -> [event, size, deadline]
+    # One task reads ahead into a bounded queue, so a group can be flushed while the source is idle. Events
+    # already queued are taken without waiting; only an empty queue costs a timed wait, and the get started
+    # for it is kept until it completes.
+    queue: asyncio.Queue = asyncio.Queue(READ_AHEAD)
+    reader = asyncio.ensure_future(_read_ahead(events, queue))
+    getter: Optional[asyncio.Future] = None
+    try:
+        while True:
+            if getter is None and not queue.empty():
+                item = queue.get_nowait()
+            elif pending:
+                if getter is None:
+                    getter = asyncio.ensure_future(queue.get())
+                timeout = max(0.0, next(iter(pending.values()))[2] - loop.time())
+                done, _ = await asyncio.wait((getter,), timeout=timeout)
+                if not done:
+                    yield pending.popitem(last=False)[1][0]
+                    continue
+                item, getter = getter.result(), None
+            elif getter is not None:
+                item, getter = await getter, None
+            else:
+                item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, _ReadError):
+                raise item.error
+            event = item
+            if not is_append_event(event):
+                while pending:
+                    yield pending.popitem(last=False)[1][0]
+                yield event
+                continue
+            key = append_event_key(event)
+            group = pending.get(key)
+            if group is None:
+                group = pending[key] = [event, 0, loop.time() + options.window]
+            else:
+                group[0] = merge_append_events(group[0], event)
+            group[1] += len(str(event.root.value or ""))
+            if group[1] >= options.maxChars:
+                del pending[key]
+                yield group[0]
+        while pending:
+            yield pending.popitem(last=False)[1][0]
+    finally:
+        for task in (getter, reader):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        await events.aclose()
+
+_END = object()
+
+class _ReadError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+async def _read_ahead(events: AsyncIterator[Any], queue: asyncio.Queue) -> None:
+    try:
+        while True:
+            await queue.put(await events.__anext__())
+    except StopAsyncIteration:
+        await queue.put(_END)
+    except Exception as e:
+        await queue.put(_ReadError(e))
@@ -1 +1,3 @@
-from .agent import *
\ No newline at end of file
+from .agent import *
+from .stream import *
+from .subscription import *
\ No newline at end of file
@@ -1,8 +1,8 @@
+import asyncio
 import json
 
-from urllib.parse import urljoin
-from pydantic import BaseModel
-from typing import Any, Dict, Optional, Union, Callable, Coroutine
+from pydantic import BaseModel, PrivateAttr, ConfigDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union, Callable, Coroutine
 import aiohttp
 
 from integrail_sdk.types import (
@@ -11,57 +11,134 @@ from integrail_sdk.types import (
     AgentExecutionStatus,
     AgentSubcategory,
     ExecutionEvent,
+    ExecutionEventOp,
+    ExecutionReducer,
     InitEvent,
     InlineAgent,
+    LiteEvent,
+    NodeCatalog,
     NodeDefinition,
     UpdateStatusEvent,
+    parse_lite_event,
 )
 from integrail_sdk.api.base import BaseApi, BaseResponse
-from integrail_sdk.helpers.jsonl import jsonl
+from integrail_sdk.api.errors import ApiError
+from integrail_sdk.api.execution_cache import ExecutionCache, canonical_hash
+from integrail_sdk.api.resume import DISCONNECT_ERRORS, SkippedLine, StreamPosition, resume_stream, skipped_line
+from integrail_sdk.api.coalesce import CoalesceOptions, coalesce_append_events
+from integrail_sdk.api.common.stream import ExecutionStream, StreamOverflowPolicy
+from integrail_sdk.api.common.subscription import EventSubscription
+from integrail_sdk.helpers.concurrency import SingleFlight
+from integrail_sdk.helpers.fast_json import loads
+from integrail_sdk.helpers.jsonl import iter_jsonl
+from integrail_sdk.helpers.upload import ProgressCallback, multipart_form
+
+
+async def _replay(events: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    for data in events:
+        yield data
 
 
 class BaseAgentApi(BaseApi):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.single_flight = SingleFlight() if self.options.singleFlight else None
+        # Results cached for one API token are never replayed to another one.
+        self.cache_namespace = canonical_hash([str(self.options.baseUri), self.options.apiToken])
+        # Producer tasks of the open streams, and cancellations of abandoned executions still being sent.
+        self._producers: Set[asyncio.Task] = set()
+        self._cancellations: Set[asyncio.Task] = set()
+
+    async def aclose(self) -> None:
+        # Stops the streams that are still open, which may abandon their executions, and lets the
+        # cancellations reach the server before the transport goes away.
+        while self._producers or self._cancellations:
+            for producer in self._producers:
+                producer.cancel()
+            await asyncio.gather(*self._producers, *self._cancellations, return_exceptions=True)
+        await super().aclose()
+
     async def wrap_execution(
             self,
             url: str,
             payload: Dict[str, Any],
             on_event: Optional[Callable[[ExecutionEvent, Optional[AgentExecution]], Any]] = None,
             on_finish: Optional[Callable[[Optional[AgentExecution]], Coroutine[Any, Any, Any]]] = None,
-    ) -> Union[None, 'AgentExecuteNonStreamingResponse']:
-        if payload.get("stream") and on_event:
-            async def handle_event(data):
-                nonlocal execution
-                event = ExecutionEvent(**data)
-                if isinstance(event.root, InitEvent):
-                    execution = AgentExecution(**event.root.execution.model_dump(by_alias=True))
-                elif execution is not None:
-                    events = []
-                    if execution.events:
-                        events = [*execution.events]
-                    events.append(event.root)
-                    execution_dict = execution.model_dump(by_alias=True)
-                    execution_dict["events"] = events
-                    execution = AgentExecution.apply_events(
-                        AgentExecution(**execution_dict)
-                    )
-                else:
-                    raise ValueError("Execution is None")
-                if on_event:
-                    await on_event(event, execution)
-                if on_finish and isinstance(event.root, UpdateStatusEvent) and execution.status in [
-                    AgentExecutionStatus.FINISHED, AgentExecutionStatus.CANCELLED, AgentExecutionStatus.ERROR]:
-                    await on_finish(execution)
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(urljoin(str(self.options.baseUri), url), json=payload, headers={
-                    'Authorization': f'Bearer {self.options.apiToken}',
-                }) as response:
-                    execution: Optional[AgentExecution] = None
-                    await jsonl(response, handle_event)
-        else:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(urljoin(str(self.options.baseUri), url), json=payload) as response:
-                    return await response.json()
+            subscription: Optional[EventSubscription] = None,
+            lite: bool = False,
+            use_cache: bool = True,
+            cache_version: Optional[str] = None,
+            coalesce: Optional[CoalesceOptions] = None,
+    ) -> Union[AgentExecution, 'AgentExecuteNonStreamingResponse']:
+        # With ApiOptions.singleFlight, calls with the same URL and payload made while one of them is running
+        # share its execution: every caller gets all events through its own on_event / on_finish and the same
+        # final result. Events and executions are shared objects, so callers must not modify them. Calls
+        # with a subscription are always executed on their own.
+        coalesce = coalesce if coalesce is not None else self.options.coalesce
+        if self.single_flight is None or subscription is not None:
+            return await self.execute_once(url, payload, on_event, on_finish, subscription, lite, use_cache, cache_version, coalesce)
+        streaming = bool(payload.get("stream") and on_event)
+
+        async def call(publish: Callable[[Tuple[ExecutionEvent, AgentExecution]], None]):
+            async def forward(event: ExecutionEvent, execution: AgentExecution) -> None:
+                publish((event, execution))
+            return await self.execute_once(
+                url, payload, forward if streaming else None, None, None, lite, use_cache, cache_version, coalesce)
+
+        finished = False
+
+        async def deliver(item: Tuple[ExecutionEvent, AgentExecution]) -> None:
+            nonlocal finished
+            event, execution = item
+            await on_event(event, execution)
+            if on_finish and not finished and BaseAgentApi.is_finish_event(event, execution):
+                finished = True
+                await on_finish(execution)
+
+        key = canonical_hash([url, payload, streaming, lite, use_cache, cache_version, coalesce and coalesce.model_dump()])
+        result = await self.single_flight.run(key, call, deliver if streaming else None)
+        return dict(result) if isinstance(result, dict) else result
+
+    async def execute_once(
+            self,
+            url: str,
+            payload: Dict[str, Any],
+            on_event: Optional[Callable[[ExecutionEvent, Optional[AgentExecution]], Any]] = None,
+            on_finish: Optional[Callable[[Optional[AgentExecution]], Coroutine[Any, Any, Any]]] = None,
+            subscription: Optional[EventSubscription] = None,
+            lite: bool = False,
+            use_cache: bool = True,
+            cache_version: Optional[str] = None,
+            coalesce: Optional[CoalesceOptions] = None,
+    ) -> Union[AgentExecution, 'AgentExecuteNonStreamingResponse']:
+        # With ApiOptions.executionCache set, a request that already finished is replayed from the cache:
+        # streaming callers get the recorded events, others the id of the recorded execution.
+        cache = self.execution_cache if use_cache else None
+        key = ExecutionCache.key(url, payload, cache_version, self.cache_namespace) if cache is not None else None
+        if cache is not None:
+            cached = await cache.get(key)
+            if cached is not None:
+                if payload.get("stream") and on_event:
+                    return await BaseAgentApi.dispatch(
+                        BaseAgentApi.iter_events(_replay(cached.events()), subscription, lite, None, coalesce), on_event, on_finish)
+                return {"status": "ok", "executionId": cached.execution_id}
+        await self.before_execute(payload)
+        async with await self.fetch(url, BaseAgentApi.execute_init(payload, json=payload)) as response:
+            if payload.get("stream") and on_event:
+                # Recorded only without a subscription, as a filtered stream cannot be replayed to others.
+                record = [] if cache is not None and subscription is None else None
+                position = StreamPosition()
+                try:
+                    execution = await self.handle_stream(
+                        response, on_event, on_finish, subscription, lite, record, coalesce, url, position)
+                except asyncio.CancelledError:
+                    self.cancel_abandoned(url, position)
+                    raise
+                if record is not None and execution is not None and execution.status == AgentExecutionStatus.FINISHED:
+                    await cache.put(key, execution.id, record)
+                return execution
+            else:
+                return await response.json()
 
     async def wrap_execution_multipart(
             self,
@@ -70,51 +147,245 @@ class BaseAgentApi(BaseApi):
             files: Dict[str, Any],
             on_event: Optional[Callable[[ExecutionEvent, Optional[AgentExecution]], Coroutine[Any, Any, Any]]] = None,
             on_finish: Optional[Callable[[Optional[AgentExecution]], Coroutine[Any, Any, Any]]] = None,
-    ) -> Union[aiohttp.ClientResponse, 'AgentExecuteNonStreamingResponse']:
-        form_data = aiohttp.FormData()
-        for key, value in files.items():
-            form_data.add_field(key, value)
-        form_data.add_field("payload", json.dumps(payload))
-
-        if payload.get("stream") and on_event:
-            async def handle_event(data):
-                nonlocal execution
-                event = ExecutionEvent(**data)
-                if isinstance(event.root, InitEvent):
-                    execution = AgentExecution(**event.root.execution.model_dump(by_alias=True))
-                elif execution is not None:
-                    events = []
-                    if execution.events:
-                        events = [*execution.events]
-                    events.append(event.root)
-                    execution_dict = execution.model_dump(by_alias=True)
-                    execution_dict["events"] = events
-                    execution = AgentExecution.apply_events(
-                        AgentExecution(**execution_dict)
-                    )
-                else:
-                    raise ValueError("Execution is None")
-                if on_event:
-                    await on_event(event, execution)
-                if on_finish and isinstance(event.root, UpdateStatusEvent) and execution.status in [
-                    AgentExecutionStatus.FINISHED, AgentExecutionStatus.CANCELLED, AgentExecutionStatus.ERROR]:
-                    await on_finish(execution)
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(urljoin(str(self.options.baseUri), url), data=form_data, headers={
-                    'Authorization': f'Bearer {self.options.apiToken}',
-                }) as response:
-                    execution: Optional[AgentExecution] = None
-                    await jsonl(response, handle_event)
-        else:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(urljoin(str(self.options.baseUri), url), data=form_data) as response:
-                    return await response.json()
+            subscription: Optional[EventSubscription] = None,
+            on_progress: Optional[ProgressCallback] = None,
+            lite: bool = False,
+            coalesce: Optional[CoalesceOptions] = None,
+    ) -> Union[AgentExecution, 'AgentExecuteNonStreamingResponse']:
+        # Files are streamed from their source while the request is written; when all of them can be
+        # re-read, the form is rebuilt for every attempt so the request stays retryable.
+        await self.before_execute(payload)
+        form_data = multipart_form({**files, "payload": json.dumps(payload)}, on_progress)
+        async with await self.fetch(url, BaseAgentApi.execute_init(payload, data=form_data)) as response:
+            if payload.get("stream") and on_event:
+                coalesce = coalesce if coalesce is not None else self.options.coalesce
+                position = StreamPosition()
+                try:
+                    return await self.handle_stream(response, on_event, on_finish, subscription, lite, None, coalesce, url, position)
+                except asyncio.CancelledError:
+                    self.cancel_abandoned(url, position)
+                    raise
+            else:
+                return await response.json()
+
+    def stream_execution(
+            self,
+            url: str,
+            payload: Dict[str, Any],
+            max_queue: int = 256,
+            overflow: StreamOverflowPolicy = StreamOverflowPolicy.BLOCK,
+            subscription: Optional[EventSubscription] = None,
+            lite: bool = False,
+            coalesce: Optional[CoalesceOptions] = None,
+    ) -> ExecutionStream:
+        payload = {**payload, "stream": True}
+        coalesce = coalesce if coalesce is not None else self.options.coalesce
+
+        async def open_response() -> aiohttp.ClientResponse:
+            await self.before_execute(payload)
+            return await self.fetch(url, BaseAgentApi.execute_init(payload, json=payload))
+
+        position = StreamPosition()
+        return ExecutionStream(
+            open_response,
+            lambda response: self.iter_stream(response, subscription, lite, None, coalesce, url, position),
+            max_queue,
+            overflow,
+            lambda: self.cancel_abandoned(url, position),
+            self._producers,
+        )
+
+    async def before_execute(self, payload: Dict[str, Any]) -> None:
+        # Runs before every execution request; sub-APIs that know the definition of what they execute
+        # override it to validate inputs locally when ApiOptions.validateInputs is set.
+        pass
+
+    async def handle_stream(
+            self,
+            response: aiohttp.ClientResponse,
+            on_event: Optional[Callable[[ExecutionEvent, Optional[AgentExecution]], Any]] = None,
+            on_finish: Optional[Callable[[Optional[AgentExecution]], Coroutine[Any, Any, Any]]] = None,
+            subscription: Optional[EventSubscription] = None,
+            lite: bool = False,
+            record: Optional[List[Dict[str, Any]]] = None,
+            coalesce: Optional[CoalesceOptions] = None,
+            url: Optional[str] = None,
+            position: Optional[StreamPosition] = None,
+    ) -> Optional[AgentExecution]:
+        return await BaseAgentApi.dispatch(
+            self.iter_stream(response, subscription, lite, record, coalesce, url, position), on_event, on_finish)
+
+    @staticmethod
+    async def dispatch(
+            items: AsyncIterator[Tuple[Union[ExecutionEvent, LiteEvent], ExecutionReducer]],
+            on_event: Optional[Callable[[ExecutionEvent, Optional[AgentExecution]], Any]] = None,
+            on_finish: Optional[Callable[[Optional[AgentExecution]], Coroutine[Any, Any, Any]]] = None,
+    ) -> Optional[AgentExecution]:
+        reducer: Optional[ExecutionReducer] = None
+        finished = False
+        async for event, reducer in items:
+            if on_event:
+                await on_event(event, reducer.snapshot())
+            if on_finish and not finished and BaseAgentApi.is_finish_event(event, reducer):
+                finished = True
+                await on_finish(reducer.snapshot())
+        return reducer.snapshot() if reducer is not None else None
+
+    async def iter_stream(
+            self,
+            response: aiohttp.ClientResponse,
+            subscription: Optional[EventSubscription] = None,
+            lite: bool = False,
+            record: Optional[List[Dict[str, Any]]] = None,
+            coalesce: Optional[CoalesceOptions] = None,
+            url: Optional[str] = None,
+            position: Optional[StreamPosition] = None,
+    ) -> AsyncIterator[Tuple[Union[ExecutionEvent, LiteEvent], ExecutionReducer]]:
+        # `url` is the URL the execution was started with; it enables resuming (see track_lines), and
+        # `position` tells the caller how far the stream got.
+        accept = subscription.accepts_line if subscription else None
+        # Lines the subscription drops unparsed still move the position on, or a resume would repeat them.
+        rejected = skipped_line if accept is not None and url is not None else None
+        lines = iter_jsonl(response, accept=accept, rejected=rejected)
+        if url is not None:
+            lines = self.track_lines(url, lines, position or StreamPosition())
+        async for item in BaseAgentApi.iter_events(lines, subscription, lite, record, coalesce):
+            yield item
+
+    async def track_lines(
+            self,
+            url: str,
+            lines: AsyncIterator[Dict[str, Any]],
+            position: StreamPosition,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # Passes the raw events of a streaming response through and keeps `position` up to date. With
+        # ApiOptions.resume, when the response is cut off or ends before the execution does, it re-attaches
+        # to the execution and continues after the last event it passed on (see resume_stream), so the
+        # reducer carries on and the final status arrives once.
+        error: Optional[BaseException] = None
+        try:
+            async for data in lines:
+                if type(data) is SkippedLine:
+                    position.count(data.created_at)
+                    continue
+                position.advance(data)
+                yield data
+        except DISCONNECT_ERRORS as e:
+            error = e
+        if position.ended:
+            return
+        path = BaseAgentApi.execution_path(url, position.execution_id)
+        if path is None or self.options.resume is None:
+            if error is not None:
+                raise error
+            return
+
+        async def fetch_execution() -> Dict[str, Any]:
+            async with await self.http_get(path) as response:
+                return loads(await response.read())
+
+        async for data in resume_stream(fetch_execution, position, self.options.resume):
+            yield data
+
+    def cancel_abandoned(self, url: str, position: StreamPosition) -> None:
+        # Called when whoever consumed a streaming execution was cancelled before it ended: with
+        # ApiOptions.cancelAbandoned the execution is cancelled on the server as well, in the background,
+        # since nobody is going to read its result.
+        path = BaseAgentApi.execution_path(url, position.execution_id)
+        if not self.options.cancelAbandoned or position.ended or path is None or self.transport.closed:
+            return
+        task = asyncio.ensure_future(self._cancel(path))
+        self._cancellations.add(task)
+        task.add_done_callback(self._cancellations.discard)
+
+    async def _cancel(self, path: str) -> None:
+        try:
+            async with await self.fetch(f"{path}/cancel", {'method': 'POST', 'idempotent': True}):
+                pass
+        except (ApiError, aiohttp.ClientError):
+            pass
+
+    @staticmethod
+    def execution_path(url: str, execution_id: Optional[str]) -> Optional[str]:
+        # Executions are read per account, so only executions started under "api/{account_id}/..." can be
+        # re-attached to; node executions ("api/node/execute") carry no account.
+        parts = url.split("/")
+        if execution_id is None or len(parts) < 3 or parts[0] != "api" or parts[1] == "node":
+            return None
+        return f"api/{parts[1]}/execution/{execution_id}"
+
+    @staticmethod
+    async def iter_events(
+            source: AsyncIterator[Dict[str, Any]],
+            subscription: Optional[EventSubscription] = None,
+            lite: bool = False,
+            record: Optional[List[Dict[str, Any]]] = None,
+            coalesce: Optional[CoalesceOptions] = None,
+    ) -> AsyncIterator[Tuple[Union[ExecutionEvent, LiteEvent], ExecutionReducer]]:
+        # Yields every event with the reducer it was applied to, which is only valid until the next event:
+        # consumers call reducer.snapshot() for the events they need an execution for. `coalesce` merges
+        # token events before they reach the reducer. Events that a subscription lets through but does not
+        # match (see EventSubscription.accepts_line) are applied without being yielded.
+        events = BaseAgentApi.parse_events(source, lite, record)
+        if coalesce is not None:
+            events = coalesce_append_events(events, coalesce)
+        reducer: Optional[ExecutionReducer] = None
+        async for event in events:
+            if isinstance(event.root, InitEvent):
+                # A second init of the same execution catches a resumed stream up (see resume_stream); it
+                # replaces the reducer state without being delivered again.
+                replayed = reducer is not None and reducer.execution_id == event.root.execution.id
+                reducer = ExecutionReducer.from_init(event.root)
+                if replayed:
+                    continue
+            elif reducer is not None:
+                reducer.apply(event.root)
+            else:
+                raise ValueError("Execution is None")
+            if subscription is None or subscription.matches(event):
+                yield event, reducer
+
+    @staticmethod
+    async def parse_events(
+            source: AsyncIterator[Dict[str, Any]],
+            lite: bool = False,
+            record: Optional[List[Dict[str, Any]]] = None,
+    ) -> AsyncIterator[Union[ExecutionEvent, LiteEvent]]:
+        # With `lite`, token events are delivered as unvalidated LiteEvents (see parse_event_lite).
+        # `record` collects the raw events as they arrive.
+        parse = BaseAgentApi.parse_event_lite if lite else BaseAgentApi.parse_event
+        async for data in source:
+            if record is not None:
+                record.append(data)
+            yield parse(data)
+
+    @staticmethod
+    def execute_init(payload: Dict[str, Any], **init: Any) -> Dict[str, Any]:
+        # Executions keyed by an externalId are deduplicated server-side and therefore safe to retry.
+        return {'method': 'POST', 'idempotent': bool(payload.get("externalId")), **init}
+
+    @staticmethod
+    def parse_event(data: Dict[str, Any]) -> ExecutionEvent:
+        if data.get("op") == ExecutionEventOp.INIT:
+            # The pipeline is by far the largest part of the init event and most consumers never read it.
+            return ExecutionEvent(**{**data, "execution": AgentExecution.validate_lazy(data["execution"])})
+        return ExecutionEvent(**data)
+
+    @staticmethod
+    def parse_event_lite(data: Dict[str, Any]) -> Union[ExecutionEvent, LiteEvent]:
+        # output.update and node.output.update become LiteEvents; everything else is validated as usual.
+        return parse_lite_event(data) or BaseAgentApi.parse_event(data)
+
+    @staticmethod
+    def is_finish_event(event: ExecutionEvent, execution: Union[AgentExecution, ExecutionReducer]) -> bool:
+        return isinstance(event.root, UpdateStatusEvent) and execution.status in [
+            AgentExecutionStatus.FINISHED, AgentExecutionStatus.CANCELLED, AgentExecutionStatus.ERROR]
 
 
 # Options
 
 class BaseAgentExecutionOptions(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     pass
 
 
@@ -132,17 +403,27 @@ AgentExecutionOptions = Union[AgentExecutionOptionsNonStreaming, AgentExecutionO
 # Node definition list
 
 class NodeDefinitionListResponse(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     nodes: list[NodeDefinition]
+    _catalog: Optional[NodeCatalog] = PrivateAttr(default=None)
+
+    def catalog(self) -> NodeCatalog:
+        # Built once per response, so a cached node list also reuses its indexes.
+        if self._catalog is None:
+            self._catalog = NodeCatalog(self.nodes)
+        return self._catalog
 
 
 # Node definition category list
 
 class AgentCategorySchema(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     name: AgentCategory
     title: str
 
 
 class AgentSubcategorySchema(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     name: AgentSubcategory
     title: str
     description: str
@@ -157,14 +438,17 @@ class AgentCategoryListResponse(BaseResponse):
 # Agent execute
 
 class BaseNonStreamingRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     stream: Optional[bool] = False
 
 
 class BaseStreamingRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     stream: bool = True
 
 
 class SingleNodeExecuteRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     nodeName: str
     inputs: Dict[str, Any]
     stream: Optional[bool] = None
@@ -179,6 +463,7 @@ class SingleNodeExecuteNonStreamingRequest(SingleNodeExecuteRequest):
 
 
 class AgentExecuteRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     inputs: Dict[str, Any]
     stream: Optional[bool] = None
 
@@ -192,6 +477,7 @@ class AgentExecuteNonStreamingRequest(AgentExecuteRequest):
 
 
 class AgentExecuteInlineRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     inputs: Dict[str, Any]
     pipeline: InlineAgent
     stream: Optional[bool] = None
@@ -0,0 +1,188 @@
+import asyncio
+
+from collections import deque
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Optional, Set, Tuple
+import aiohttp
+
+from integrail_sdk.types import AgentExecution, ExecutionEvent, ExecutionReducer
+from integrail_sdk.api.coalesce import append_event_key, is_append_event, merge_append_events
+
+ExecutionStreamItem = Tuple[ExecutionEvent, AgentExecution]
+
+class StreamOverflowPolicy(str, Enum):
+    BLOCK = "block"        # Stop reading from the socket until the consumer catches up.
+    DROP = "drop"          # Drop intermediate token (append) events; their text is still in later snapshots.
+    COALESCE = "coalesce"  # Merge consecutive token events for the same output into one event.
+
+class ExecutionStream:
+    # The producer task only holds the queue, never the stream itself: a consumer that breaks out of
+    # `async for` without `async with`/aclose() lets go of the last reference to the stream, and __del__
+    # then cancels the producer, which closes the response.
+
+    def __init__(
+            self,
+            open_response: Callable[[], Awaitable[aiohttp.ClientResponse]],
+            iterate: Callable[[aiohttp.ClientResponse], AsyncIterator[Tuple[ExecutionEvent, ExecutionReducer]]],
+            max_queue: int = 256,
+            overflow: StreamOverflowPolicy = StreamOverflowPolicy.BLOCK,
+            on_cancel: Optional[Callable[[], None]] = None,
+            tasks: Optional[Set[asyncio.Task]] = None,
+    ):
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        self._open_response = open_response
+        self._iterate = iterate
+        # Called when the stream is closed or abandoned before the response was read to its end.
+        self._on_cancel = on_cancel
+        # The producer task is kept in `tasks` while it runs, so that whoever owns the stream can stop it.
+        self._tasks = tasks
+        self.execution: Optional[AgentExecution] = None
+        self._queue = _StreamQueue(max_queue, StreamOverflowPolicy(overflow))
+        self._producer: Optional[asyncio.Task] = None
+
+    @property
+    def max_queue(self) -> int:
+        return self._queue.max_queue
+
+    @property
+    def overflow(self) -> StreamOverflowPolicy:
+        return self._queue.overflow
+
+    @property
+    def dropped(self) -> int:
+        return self._queue.dropped
+
+    @property
+    def coalesced(self) -> int:
+        return self._queue.coalesced
+
+    def __aiter__(self) -> 'ExecutionStream':
+        return self
+
+    async def __anext__(self) -> ExecutionStreamItem:
+        self._start()
+        queue = self._queue
+        while not queue.items:
+            if queue.done:
+                if queue.error is not None:
+                    error, queue.error = queue.error, None
+                    raise error
+                raise StopAsyncIteration
+            await queue.wait()
+        item = queue.items.popleft()
+        queue.notify()
+        self.execution = item[1]
+        return item
+
+    async def __aenter__(self) -> 'ExecutionStream':
+        self._start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        producer = self._producer
+        if producer is not None and not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+        self._queue.done = True
+        self._queue.items.clear()
+
+    def __del__(self):
+        # Consumer broke out of `async for` without `async with`/aclose(): stop reading the response.
+        producer = self._producer
+        if producer is not None and not producer.done():
+            try:
+                producer.get_loop().call_soon_threadsafe(producer.cancel)
+            except RuntimeError:
+                pass
+
+    def _start(self) -> None:
+        if self._producer is None:
+            self._queue.changed = asyncio.Event()
+            self._producer = asyncio.create_task(
+                _produce(self._queue, self._open_response, self._iterate, self._on_cancel))
+            if self._tasks is not None:
+                self._tasks.add(self._producer)
+                self._producer.add_done_callback(self._tasks.discard)
+
+async def _produce(
+        queue: '_StreamQueue',
+        open_response: Callable[[], Awaitable[aiohttp.ClientResponse]],
+        iterate: Callable[[aiohttp.ClientResponse], AsyncIterator[Tuple[ExecutionEvent, ExecutionReducer]]],
+        on_cancel: Optional[Callable[[], None]],
+) -> None:
+    try:
+        async with await open_response() as response:
+            try:
+                async for event, reducer in iterate(response):
+                    await queue.put(event, reducer)
+            except asyncio.CancelledError:
+                response.close()
+                raise
+    except asyncio.CancelledError:
+        if on_cancel is not None:
+            on_cancel()
+        raise
+    except BaseException as e:
+        queue.error = e
+    finally:
+        queue.done = True
+        queue.notify()
+
+class _StreamQueue:
+    # The state an ExecutionStream shares with its producer task.
+
+    def __init__(self, max_queue: int, overflow: StreamOverflowPolicy):
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.items: Deque[ExecutionStreamItem] = deque()
+        self.changed: Optional[asyncio.Event] = None
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.dropped = 0
+        self.coalesced = 0
+
+    async def wait(self) -> None:
+        self.changed.clear()
+        await self.changed.wait()
+
+    def notify(self) -> None:
+        self.changed.set()
+
+    async def put(self, event: ExecutionEvent, reducer: ExecutionReducer) -> None:
+        # The reducer does not change while this waits, and dropped events never get a snapshot.
+        while len(self.items) >= self.max_queue:
+            if self.overflow == StreamOverflowPolicy.DROP and self._drop(event):
+                return
+            if self.overflow == StreamOverflowPolicy.COALESCE and self._coalesce(event, reducer):
+                return
+            if len(self.items) >= self.max_queue:
+                await self.wait()
+        self.items.append((event, reducer.snapshot()))
+        self.notify()
+
+    def _drop(self, event: ExecutionEvent) -> bool:
+        if is_append_event(event):
+            self.dropped += 1
+            return True
+        # A status event must get through: make room by discarding the oldest queued token event.
+        for i, (queued, _) in enumerate(self.items):
+            if is_append_event(queued):
+                del self.items[i]
+                self.dropped += 1
+                break
+        return False
+
+    def _coalesce(self, event: ExecutionEvent, reducer: ExecutionReducer) -> bool:
+        last_event = self.items[-1][0]
+        if is_append_event(event) and is_append_event(last_event) and append_event_key(event) == append_event_key(last_event):
+            self.items[-1] = (merge_append_events(last_event, event), reducer.snapshot())
+            self.coalesced += 1
+            return True
+        return False
@@ -0,0 +1,72 @@
+import re
+
+from pydantic import BaseModel, PrivateAttr
+from typing import Any, FrozenSet, List, Optional, Pattern
+
+from integrail_sdk.types import ExecutionEvent, ExecutionEventOp
+
+_OP = re.compile(rb'"op"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_NODE_ID = re.compile(rb'"nodeId"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_OUTPUT = re.compile(rb'"output"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+_LIFECYCLE_OPS = frozenset({ExecutionEventOp.INIT, ExecutionEventOp.UPDATE_STATUS})
+_LIFECYCLE_OPS_RAW = frozenset(op.value.encode() for op in _LIFECYCLE_OPS)
+# Status events are small and rare, so they are always parsed and applied to the execution, and only
+# delivered when they match. Token events that do not match are skipped unparsed.
+_APPLIED_OPS_RAW = _LIFECYCLE_OPS_RAW | frozenset(
+    op.value.encode() for op in (ExecutionEventOp.NODE_UPDATE_STATUS, ExecutionEventOp.NODE_OUTPUT_UPDATE_STATUS))
+
+class EventSubscription(BaseModel):
+    # Restricts which streamed events are validated and delivered. Every given filter must match, and an
+    # event without the filtered attribute (e.g. an agent output for `nodeIds`) does not match it.
+    # init and updateStatus events are always delivered because the execution lifecycle depends on them.
+    # The executions delivered with the events miss the text of the token events that were skipped.
+    ops: Optional[List[ExecutionEventOp]] = None
+    outputs: Optional[List[str]] = None
+    nodeIds: Optional[List[str]] = None
+
+    _raw_ops: Optional[FrozenSet[bytes]] = PrivateAttr(default=None)
+    _raw_outputs: Optional[FrozenSet[bytes]] = PrivateAttr(default=None)
+    _raw_node_ids: Optional[FrozenSet[bytes]] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.ops is not None:
+            self._raw_ops = frozenset(op.value.encode() for op in self.ops)
+        if self.outputs is not None:
+            self._raw_outputs = frozenset(output.encode() for output in self.outputs)
+        if self.nodeIds is not None:
+            self._raw_node_ids = frozenset(node_id.encode() for node_id in self.nodeIds)
+
+    def accepts_line(self, line: memoryview) -> bool:
+        # Cheap pre-check on the raw JSON line. Whenever the line is ambiguous (nested or escaped keys)
+        # it is accepted and left to `matches` after full validation.
+        ops = _OP.findall(line)
+        if len(ops) != 1 or ops[0] in _APPLIED_OPS_RAW:
+            return True
+        if self._raw_ops is not None and ops[0] not in self._raw_ops:
+            return False
+        return (
+            EventSubscription._sniff(_NODE_ID, line, self._raw_node_ids)
+            and EventSubscription._sniff(_OUTPUT, line, self._raw_outputs)
+        )
+
+    def matches(self, event: ExecutionEvent) -> bool:
+        root = event.root
+        if root.op in _LIFECYCLE_OPS:
+            return True
+        if self.ops is not None and root.op not in self.ops:
+            return False
+        if self.nodeIds is not None and getattr(root, "nodeId", None) not in self.nodeIds:
+            return False
+        if self.outputs is not None and getattr(root, "output", None) not in self.outputs:
+            return False
+        return True
+
+    @staticmethod
+    def _sniff(pattern: Pattern[bytes], line: memoryview, allowed: Optional[FrozenSet[bytes]]) -> bool:
+        if allowed is None:
+            return True
+        found = pattern.findall(line)
+        if len(found) != 1 or b"\\" in found[0]:
+            return len(found) > 0
+        return found[0] in allowed
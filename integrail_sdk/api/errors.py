@@ -0,0 +1,67 @@
+import asyncio
+
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Mapping, Optional
+
+class ApiError(Exception):
+    pass
+
+class ApiConnectionError(ApiError):
+    pass
+
+class ApiTimeoutError(ApiError, asyncio.TimeoutError):
+    pass
+
+class ApiStatusError(ApiError):
+    def __init__(self, status: int, body: Any = None, headers: Optional[Mapping[str, str]] = None, method: Optional[str] = None, url: Optional[str] = None):
+        super().__init__(f"Request failed with status {status}")
+        self.status = status
+        self.body = body
+        self.headers = dict(headers or {})
+        self.method = method
+        self.url = url
+
+    @property
+    def retry_after(self) -> Optional[float]:
+        value = self.headers.get("Retry-After") or self.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+class ApiClientError(ApiStatusError):
+    pass
+
+class ApiAuthenticationError(ApiClientError):
+    pass
+
+class ApiNotFoundError(ApiClientError):
+    pass
+
+class ApiRateLimitError(ApiClientError):
+    pass
+
+class ApiServerError(ApiStatusError):
+    pass
+
+def status_error(status: int, body: Any = None, headers: Optional[Mapping[str, str]] = None, method: Optional[str] = None, url: Optional[str] = None) -> ApiStatusError:
+    if status == 429:
+        error_type = ApiRateLimitError
+    elif status in (401, 403):
+        error_type = ApiAuthenticationError
+    elif status == 404:
+        error_type = ApiNotFoundError
+    elif 400 <= status < 500:
+        error_type = ApiClientError
+    elif status >= 500:
+        error_type = ApiServerError
+    else:
+        error_type = ApiStatusError
+    return error_type(status, body, headers, method, url)
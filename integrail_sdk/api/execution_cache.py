@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from pydantic import BaseModel
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from integrail_sdk.helpers.fast_json import loads
+
+if TYPE_CHECKING:
+    import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Request fields that do not change what an execution computes.
+IGNORED_PAYLOAD_FIELDS = frozenset({"stream", "externalId"})
+
+def canonical_hash(value: Any) -> str:
+    # Same hash for equal JSON values no matter the order their keys were given in.
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class ExecutionCacheOptions(BaseModel):
+    ttl: float = 24 * 3600.0                  # Seconds a recorded execution is replayed instead of run again.
+    maxEntries: int = 1024                    # In-memory tier, least recently used entries are evicted first.
+    maxBytes: int = 64 * 1024 * 1024          # In-memory tier, counted as the size of the recorded events.
+    path: Optional[str] = None                # SQLite database for the persistent tier.
+    maxPersistentBytes: int = 1024 * 1024 * 1024
+
+class ExecutionCacheStats(BaseModel):
+    hits: int = 0        # Replayed from memory.
+    diskHits: int = 0    # Replayed from the persistent tier.
+    misses: int = 0      # Executed on the server.
+    stored: int = 0      # Finished executions recorded.
+    evicted: int = 0     # Dropped from memory because of maxEntries / maxBytes.
+
+class CachedExecution:
+    def __init__(self, execution_id: Optional[str], body: bytes, stored_at: float):
+        self.execution_id = execution_id
+        self.body = body
+        self.stored_at = stored_at
+
+    def events(self) -> List[Dict[str, Any]]:
+        # Decoded on every replay, so callers never share (and mutate) the same event dicts.
+        return loads(self.body)
+
+class ExecutionCache:
+    # Memoizes finished executions: the raw events of a streaming execution are recorded under a hash of
+    # what was executed and replayed to later callers with the same request. Only safe for deterministic
+    # nodes and agents, which is why it is opt-in (ApiOptions.executionCache) and can be bypassed per call.
+    # Recent entries are kept in memory; with `path` set, every entry is also written to SQLite so it
+    # survives process restarts. Errors of the persistent tier are logged and treated as misses, so a
+    # broken cache never fails an execution.
+
+    def __init__(self, options: Optional[ExecutionCacheOptions] = None):
+        self.options = options or ExecutionCacheOptions()
+        self.stats = ExecutionCacheStats()
+        self._path = os.path.expanduser(self.options.path) if self.options.path else None
+        self._entries: 'OrderedDict[str, CachedExecution]' = OrderedDict()
+        self._bytes = 0
+        self._initialized = False
+
+    @staticmethod
+    def key(url: str, payload: Dict[str, Any], version: Optional[str] = None, namespace: Optional[str] = None) -> str:
+        # `url` names the node or agent (and account), `payload` carries the inputs. `namespace` tells apart
+        # the clients sharing a persistent cache, as node URLs carry no account.
+        request = {name: value for name, value in payload.items() if name not in IGNORED_PAYLOAD_FIELDS}
+        return canonical_hash([namespace, url, version, request])
+
+    async def get(self, key: str) -> Optional[CachedExecution]:
+        entry = self._entries.get(key)
+        if entry is not None and not self._is_fresh(entry):
+            self._drop(key)
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry
+        if self._path:
+            try:
+                entry = await asyncio.get_running_loop().run_in_executor(None, self._load, key)
+            except Exception:
+                logger.warning("Could not read execution cache %s", self._path, exc_info=True)
+            if entry is not None:
+                self._remember(key, entry)
+                self.stats.diskHits += 1
+                return entry
+        self.stats.misses += 1
+        return None
+
+    async def put(self, key: str, execution_id: Optional[str], events: List[Dict[str, Any]]) -> None:
+        entry = CachedExecution(execution_id, json.dumps(events, separators=(",", ":"), default=str).encode(), time.time())
+        self._remember(key, entry)
+        self.stats.stored += 1
+        if self._path:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._store, key, entry)
+            except Exception:
+                logger.warning("Could not write execution cache %s", self._path, exc_info=True)
+
+    async def invalidate(self, key: Optional[str] = None) -> None:
+        # Without a key the whole cache is cleared, including the persistent tier.
+        if key is None:
+            self._entries.clear()
+            self._bytes = 0
+        else:
+            self._drop(key)
+        if self._path:
+            await asyncio.get_running_loop().run_in_executor(None, self._delete, key)
+
+    def _is_fresh(self, entry: CachedExecution) -> bool:
+        return time.time() - entry.stored_at < self.options.ttl
+
+    def _remember(self, key: str, entry: CachedExecution) -> None:
+        self._drop(key)
+        if len(entry.body) > self.options.maxBytes:
+            return
+        self._entries[key] = entry
+        self._bytes += len(entry.body)
+        while len(self._entries) > self.options.maxEntries or self._bytes > self.options.maxBytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.body)
+            self.stats.evicted += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+    # Persistent tier. Runs in the default executor with a connection per call, as sqlite3 connections
+    # are bound to the thread that opened them. sqlite3 is only imported once the tier is used.
+
+    @contextmanager
+    def _connect(self) -> Iterator['sqlite3.Connection']:
+        import sqlite3
+
+        if not self._initialized:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self._path, timeout=30)
+        try:
+            with connection:
+                self._initialize(connection)
+                yield connection
+        finally:
+            connection.close()
+
+    def _initialize(self, connection: 'sqlite3.Connection') -> None:
+        if not self._initialized:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS executions ("
+                "key TEXT PRIMARY KEY, executionId TEXT, storedAt REAL, accessedAt REAL, size INTEGER, body BLOB)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS executions_accessed ON executions (accessedAt)")
+            self._initialized = True
+
+    def _load(self, key: str) -> Optional[CachedExecution]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT executionId, storedAt, body FROM executions WHERE key = ? AND storedAt > ?",
+                (key, time.time() - self.options.ttl),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE executions SET accessedAt = ? WHERE key = ?", (time.time(), key))
+        return CachedExecution(row[0], bytes(row[2]), row[1])
+
+    def _store(self, key: str, entry: CachedExecution) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO executions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry.execution_id, entry.stored_at, entry.stored_at, len(entry.body), entry.body),
+            )
+            connection.execute("DELETE FROM executions WHERE storedAt <= ?", (time.time() - self.options.ttl,))
+            # Least recently replayed entries beyond maxPersistentBytes.
+            connection.execute(
+                "DELETE FROM executions WHERE key IN (SELECT key FROM ("
+                "SELECT key, SUM(size) OVER (ORDER BY accessedAt DESC, key) AS total FROM executions"
+                ") WHERE total > ?)",
+                (self.options.maxPersistentBytes,),
+            )
+
+    def _delete(self, key: Optional[str]) -> None:
+        with self._connect() as connection:
+            if key is None:
+                connection.execute("DELETE FROM executions")
+            else:
+                connection.execute("DELETE FROM executions WHERE key = ?", (key,))
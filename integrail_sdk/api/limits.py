@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+from contextlib import asynccontextmanager
+from enum import Enum
+from pydantic import BaseModel
+from typing import AsyncIterator, Dict, Optional
+
+class EndpointFamily(str, Enum):
+    EXECUTE = "execute"
+    NODE = "node"
+    MEMORY = "memory"
+    DEFAULT = "default"
+
+    @staticmethod
+    def of(path: str) -> 'EndpointFamily':
+        if "/execute" in path:
+            return EndpointFamily.EXECUTE
+        if "/memory/" in path:
+            return EndpointFamily.MEMORY
+        if path.startswith("api/node/"):
+            return EndpointFamily.NODE
+        return EndpointFamily.DEFAULT
+
+class EndpointLimitOptions(BaseModel):
+    rate: Optional[float] = None             # Requests per second; None disables the token bucket.
+    burst: Optional[int] = None              # Bucket capacity; defaults to max(1, rate).
+    maxConcurrency: Optional[int] = None     # Upper bound of the adaptive limit; None disables it.
+    minConcurrency: int = 1
+    initialConcurrency: Optional[int] = None
+    increase: float = 1.0                    # Additive increase per window of successful requests.
+    decrease: float = 0.5                    # Multiplicative decrease on throttling or a latency spike.
+    latencyThreshold: Optional[float] = None  # Absolute latency (seconds) treated as congestion.
+    latencyTolerance: float = 3.0            # Latency above this multiple of the recent average is a spike.
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class AdaptiveConcurrencyLimit:
+    # AIMD limit on requests in flight: grows by `increase` once per `limit` successful requests and is
+    # multiplied by `decrease` when the service throttles us or latency spikes. Requests that started
+    # before the last decrease do not trigger another one, so one burst of 429s shrinks the limit once.
+
+    def __init__(self, options: EndpointLimitOptions):
+        self.options = options
+        self.max = options.maxConcurrency
+        self.min = min(options.minConcurrency, self.max)
+        self.limit = float(options.initialConcurrency or self.max)
+        self.in_flight = 0
+        self._latency: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = 0.0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self) -> float:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return time.monotonic()
+
+    async def release(self, started: float, congested: bool = False) -> None:
+        latency = time.monotonic() - started
+        if not congested:
+            congested = self._is_latency_spike(latency)
+        if congested:
+            if started >= self._last_decrease:
+                self.limit = max(self.min, self.limit * self.options.decrease)
+                self._last_decrease = time.monotonic()
+        else:
+            self.limit = min(self.max, self.limit + self.options.increase / self.limit)
+            self._latency = latency if self._latency is None else 0.9 * self._latency + 0.1 * latency
+            self._samples += 1
+        # The slot is freed before waiting for the lock, so a release cancelled there cannot leak it; the
+        # notification is shielded so waiters still see it.
+        self.in_flight -= 1
+        await asyncio.shield(self._notify())
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _is_latency_spike(self, latency: float) -> bool:
+        if self.options.latencyThreshold is not None and latency > self.options.latencyThreshold:
+            return True
+        return self._samples >= 10 and latency > self._latency * self.options.latencyTolerance
+
+class EndpointLimiter:
+    def __init__(self, options: EndpointLimitOptions):
+        self.options = options
+        self.bucket = TokenBucket(options.rate, options.burst) if options.rate else None
+        self.concurrency = AdaptiveConcurrencyLimit(options) if options.maxConcurrency else None
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator['LimiterSlot']:
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        started = await self.concurrency.acquire() if self.concurrency is not None else time.monotonic()
+        slot = LimiterSlot(self)
+        try:
+            yield slot
+        finally:
+            if self.concurrency is not None:
+                await self.concurrency.release(started, slot.congested)
+
+class LimiterSlot:
+    def __init__(self, limiter: EndpointLimiter):
+        self.limiter = limiter
+        self.congested = False
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        self.congested = True
+        if retry_after and self.limiter.bucket is not None:
+            self.limiter.bucket.pause(retry_after)
+
+class RateLimiters:
+    def __init__(self, options: Optional[Dict[EndpointFamily, EndpointLimitOptions]] = None):
+        self._limiters: Dict[EndpointFamily, EndpointLimiter] = {
+            EndpointFamily(family): EndpointLimiter(family_options) for family, family_options in (options or {}).items()
+        }
+
+    def get(self, family: EndpointFamily) -> Optional[EndpointLimiter]:
+        return self._limiters.get(family) or self._limiters.get(EndpointFamily.DEFAULT)
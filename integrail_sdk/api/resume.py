@@ -0,0 +1,136 @@
+import asyncio
+import re
+
+from datetime import datetime
+from pydantic import BaseModel, TypeAdapter
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import aiohttp
+
+from integrail_sdk.helpers.fast_json import loads
+from .errors import ApiConnectionError, ApiServerError, ApiTimeoutError
+
+FINAL_STATUSES = frozenset({"finished", "cancelled", "error"})
+# Errors of a streaming response that was cut off; the execution itself keeps running on the server.
+DISCONNECT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
+
+_DATETIME = TypeAdapter(datetime)
+_CREATED_AT = re.compile(rb'"createdAt"\s*:\s*"([^"\\]*)"')
+
+class ResumeOptions(BaseModel):
+    maxAttempts: int = 5             # Consecutive failed status requests before the disconnect is raised.
+    initialInterval: float = 0.5     # Seconds between status requests while the execution is still running.
+    maxInterval: float = 5.0
+    backoff: float = 1.5
+    timeout: Optional[float] = None  # Give up when the execution has not ended this long after the disconnect.
+
+class StreamPosition:
+    # Where a stream of raw events got to: the execution it belongs to, the createdAt of the last event and
+    # how many events with that createdAt were seen, since several events can share a timestamp.
+
+    def __init__(self):
+        self.execution_id: Optional[str] = None
+        self.created_at: Any = None
+        self.seen_at_created_at = 0
+        self.status: Optional[str] = None
+        self.resumed = 0
+
+    @property
+    def ended(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    def advance(self, data: Dict[str, Any]) -> None:
+        op = data.get("op")
+        if op == "init":
+            # Not counted: executions do not list their init event among their events.
+            self.execution_id = data["execution"].get("_id")
+            self.status = data["execution"].get("status")
+            return
+        if op == "updateStatus":
+            self.status = data.get("status")
+        self.count(data.get("createdAt"))
+
+    def count(self, created_at: Any) -> None:
+        if created_at == self.created_at:
+            self.seen_at_created_at += 1
+        else:
+            self.created_at = created_at
+            self.seen_at_created_at = 1
+
+    def unseen(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # The events of `events` that come after this position, in order.
+        if self.created_at is None:
+            return list(events)
+        last = _DATETIME.validate_python(self.created_at)
+        timed = sorted(((_DATETIME.validate_python(data["createdAt"]), data) for data in events), key=lambda item: item[0])
+        unseen = []
+        skip = self.seen_at_created_at
+        for created_at, data in timed:
+            if created_at < last:
+                continue
+            if created_at == last and skip > 0:
+                skip -= 1
+                continue
+            unseen.append(data)
+        return unseen
+
+class SkippedLine:
+    # Stands in for a raw line that a subscription dropped before parsing, so that the position still
+    # counts it (see skipped_line).
+    __slots__ = ("created_at",)
+
+    def __init__(self, created_at: str):
+        self.created_at = created_at
+
+def skipped_line(line: memoryview) -> Any:
+    # Only the createdAt of a dropped line is read. A line where it cannot be told apart from a nested
+    # value is parsed after all; the subscription drops that event once it is validated.
+    found = _CREATED_AT.findall(line)
+    return SkippedLine(found[0].decode()) if len(found) == 1 else loads(line)
+
+async def resume_stream(
+        fetch_execution: Callable[[], Awaitable[Dict[str, Any]]],
+        position: StreamPosition,
+        options: ResumeOptions,
+) -> AsyncIterator[Dict[str, Any]]:
+    # Continues a cut-off stream from `position` by polling the execution until it ends. New events the
+    # execution carries are yielded as they appear. Without events, the stream is caught up at the end with
+    # an `init` event holding the fetched execution (applied but not delivered, see iter_events), followed
+    # by its final `updateStatus`.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + options.timeout if options.timeout is not None else None
+    interval = options.initialInterval
+    failures = 0
+    position.resumed += 1
+    while True:
+        try:
+            execution = (await fetch_execution())["execution"]
+        except (ApiConnectionError, ApiTimeoutError, ApiServerError):
+            failures += 1
+            if failures >= options.maxAttempts:
+                raise
+        else:
+            failures = 0
+            events = execution.get("events")
+            for data in position.unseen(events or []):
+                position.advance(data)
+                yield data
+            if position.ended:
+                return
+            if execution.get("status") in FINAL_STATUSES:
+                updated_at = execution.get("updatedAt")
+                if not events:
+                    data = {"op": "init", "createdAt": updated_at, "execution": {**execution, "events": None}}
+                    position.advance(data)
+                    yield data
+                data = {"op": "updateStatus", "createdAt": updated_at, "status": execution["status"]}
+                if execution.get("message") is not None:
+                    data["message"] = execution["message"]
+                if execution.get("_errors") is not None:
+                    data["_errors"] = execution["_errors"]
+                position.advance(data)
+                yield data
+                return
+        if deadline is not None and loop.time() + interval > deadline:
+            raise ApiTimeoutError(f"Execution {position.execution_id} did not end within {options.timeout}s of the disconnect")
+        await asyncio.sleep(interval)
+        interval = min(options.maxInterval, interval * options.backoff)
@@ -0,0 +1,152 @@
+import asyncio
+import random
+
+from contextlib import nullcontext
+from pydantic import BaseModel, Field
+from typing import Any, Collection, Dict, List, Optional
+import aiohttp
+
+from .errors import ApiConnectionError, ApiError, ApiStatusError, ApiTimeoutError, status_error
+from .limits import EndpointFamily, EndpointLimitOptions, RateLimiters
+
+class PoolOptions(BaseModel):
+    limit: int = 100
+    limitPerHost: int = 0
+    keepaliveTimeout: float = 15.0
+    dnsCacheTtl: Optional[int] = 10
+
+class TimeoutOptions(BaseModel):
+    connect: Optional[float] = 30.0
+    read: Optional[float] = 300.0   # Maximum silence between two chunks, not the length of a whole stream.
+    total: Optional[float] = None
+
+    def client_timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=self.total, sock_connect=self.connect, sock_read=self.read)
+
+class RetryPolicy(BaseModel):
+    maxRetries: int = 3
+    backoffBase: float = 0.5
+    backoffMax: float = 30.0
+    jitter: bool = True
+    retryStatuses: List[int] = Field(default_factory=lambda: [408, 429, 500, 502, 503, 504])
+    retryAfterMax: float = 120.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.retryAfterMax)
+        delay = min(self.backoffMax, self.backoffBase * (2 ** attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+class HttpTransport:
+    def __init__(
+            self,
+            pool: Optional[PoolOptions] = None,
+            timeout: Optional[TimeoutOptions] = None,
+            retry: Optional[RetryPolicy] = None,
+            limits: Optional[Dict[EndpointFamily, EndpointLimitOptions]] = None,
+    ):
+        self.pool = pool or PoolOptions()
+        self.timeout = timeout or TimeoutOptions()
+        self.retry = retry or RetryPolicy()
+        self.limiters = RateLimiters(limits)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily so that the session is bound to the running event loop. Once the transport is
+        # closed, requests fail instead of opening a session that nobody would close.
+        if self._closed:
+            raise ApiConnectionError("The HTTP transport is closed")
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool.limit,
+                limit_per_host=self.pool.limitPerHost,
+                keepalive_timeout=self.pool.keepaliveTimeout,
+                use_dns_cache=self.pool.dnsCacheTtl is not None,
+                ttl_dns_cache=self.pool.dnsCacheTtl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout.client_timeout())
+        return self._session
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        return self.session().request(method, url, **kwargs)
+
+    async def send(
+            self,
+            method: str,
+            url: str,
+            idempotent: Optional[bool] = None,
+            data: Any = None,
+            family: EndpointFamily = EndpointFamily.DEFAULT,
+            allow_statuses: Collection[int] = (),
+            **kwargs: Any,
+    ) -> aiohttp.ClientResponse:
+        # Sends a request and returns a 2xx response (or one listed in `allow_statuses`), retrying according to the retry policy. Requests that
+        # may have reached the server are only retried when idempotent; 429s and connection failures are
+        # always safe to retry because the server did not act on them. `data` may be a zero-argument
+        # callable producing a fresh body for every attempt (e.g. multipart forms, which are single-use).
+        # Every attempt passes through the rate limiter of its endpoint family, if one is configured; the
+        # concurrency slot is held until the response headers arrive.
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        # FormData is callable itself, but calling it again does not rewind the files it holds.
+        factory = callable(data) and not isinstance(data, aiohttp.FormData)
+        replayable = data is None or factory or isinstance(data, (bytes, str))
+        limiter = self.limiters.get(family)
+        attempt = 0
+        while True:
+            body = data() if factory else data
+            async with limiter.slot() if limiter is not None else nullcontext() as slot:
+                try:
+                    response = await self.request(method, url, data=body, **kwargs)
+                except aiohttp.ClientConnectorError as e:
+                    error: ApiError = ApiConnectionError(str(e))
+                    error.__cause__ = e
+                    retryable = True
+                except asyncio.TimeoutError as e:
+                    error = ApiTimeoutError(f"Request to {url} timed out")
+                    error.__cause__ = e
+                    retryable = idempotent
+                    if slot is not None:
+                        slot.throttled()
+                except aiohttp.ClientError as e:
+                    error = ApiConnectionError(str(e))
+                    error.__cause__ = e
+                    retryable = idempotent
+                else:
+                    if 200 <= response.status < 300 or response.status in allow_statuses:
+                        return response
+                    error = await HttpTransport._status_error(response, method, url)
+                    retryable = response.status in self.retry.retryStatuses and (idempotent or response.status == 429)
+                    if slot is not None and response.status in (429, 503):
+                        slot.throttled(error.retry_after)
+            if not retryable or not replayable or attempt >= self.retry.maxRetries:
+                raise error
+            retry_after = error.retry_after if isinstance(error, ApiStatusError) else None
+            await asyncio.sleep(self.retry.delay(attempt, retry_after))
+            attempt += 1
+
+    @staticmethod
+    async def _status_error(response: aiohttp.ClientResponse, method: str, url: str) -> ApiStatusError:
+        try:
+            if response.content_type == "application/json":
+                body = await response.json()
+            else:
+                body = await response.text()
+        except (aiohttp.ClientError, ValueError):
+            body = None
+        finally:
+            response.release()
+        return status_error(response.status, body, response.headers, method, url)
+
+    async def aclose(self) -> None:
+        self._closed = True
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+
+class BatchResult(NamedTuple):
+    index: int
+    result: Any = None
+    error: Optional[BaseException] = None
+
+async def aiterate(items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    # Iterates a plain iterable or an async one alike.
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def bounded_as_completed(
+        items: Union[Iterable[T], AsyncIterable[T]],
+        fn: Callable[[T], Awaitable[Any]],
+        concurrency: int,
+) -> AsyncIterator[BatchResult]:
+    # Runs fn over items with at most `concurrency` calls in flight and yields results in completion order.
+    # Items are pulled only when a slot frees up, so memory stays flat no matter how many there are.
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    source = aiterate(items)
+    pending: Dict[asyncio.Task, int] = {}
+    index = 0
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(fn(item))] = index
+                index += 1
+            if not pending:
+                return
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task_index = pending.pop(task)
+                if task.cancelled():
+                    yield BatchResult(task_index, error=asyncio.CancelledError())
+                elif task.exception() is not None:
+                    yield BatchResult(task_index, error=task.exception())
+                else:
+                    yield BatchResult(task_index, result=task.result())
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await source.aclose()
+
+class _Flight:
+    def __init__(self):
+        self.messages: List[Tuple[int, Any]] = []  # Everything published so far, for callers joining late.
+        self.queues: Set[asyncio.Queue] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    def join(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        for message in self.messages:
+            queue.put_nowait(message)
+        self.queues.add(queue)
+        return queue
+
+    def publish(self, kind: int, value: Any) -> None:
+        self.messages.append((kind, value))
+        for queue in self.queues:
+            queue.put_nowait((kind, value))
+
+_ITEM, _RESULT, _ERROR = range(3)
+
+class SingleFlight:
+    # Runs one call per key at a time: callers arriving while a call for their key is in flight join it
+    # instead of starting another. Items the call publishes are delivered to every caller (late callers
+    # get the ones they missed first), and all of them get its result or exception. A caller that is
+    # cancelled or whose on_item raises only leaves; the call is cancelled once nobody is waiting for it.
+
+    def __init__(self):
+        self.coalesced = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    async def run(
+            self,
+            key: Hashable,
+            call: Callable[[Callable[[Any], None]], Awaitable[T]],
+            on_item: Optional[Callable[[Any], Awaitable[Any]]] = None,
+    ) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(self._fly(key, flight, call))
+        else:
+            self.coalesced += 1
+        queue = flight.join()
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == _ITEM:
+                    if on_item is not None:
+                        await on_item(value)
+                elif kind == _RESULT:
+                    return value
+                else:
+                    raise value
+        finally:
+            flight.queues.discard(queue)
+            if not flight.queues and not flight.task.done():
+                flight.task.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    async def _fly(self, key: Hashable, flight: _Flight, call: Callable[[Callable[[Any], None]], Awaitable[T]]) -> None:
+        try:
+            flight.publish(_RESULT, await call(lambda item: flight.publish(_ITEM, item)))
+        except asyncio.CancelledError as e:
+            flight.publish(_ERROR, e)
+            raise
+        except Exception as e:
+            flight.publish(_ERROR, e)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
@@ -0,0 +1,35 @@
+import json
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+def _json_loads(data: Buffer) -> Any:
+    return json.loads(data.tobytes() if isinstance(data, memoryview) else data)
+
+def _msgspec_loads(data: Buffer) -> Any:
+    # Raises ValueError on invalid JSON, like the other backends.
+    try:
+        return _msgspec_decode(data)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
+
+if orjson is not None:
+    BACKEND = "orjson"
+    loads: Callable[[Buffer], Any] = orjson.loads
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _msgspec_decode = msgspec.json.Decoder().decode
+    loads = _msgspec_loads
+else:
+    BACKEND = "json"
+    loads = _json_loads
@@ -1,24 +1,93 @@
 import aiohttp
-import asyncio
-import json
-
-async def jsonl(response: aiohttp.ClientResponse, cb):
-    buffer = ""
-
-    async def flush():
-        nonlocal buffer
-        if buffer.strip():
-            lines = buffer.split("\n")
-            for line in lines[:-1]:
-                parsed = json.loads(line)
-                await cb(parsed)
-            # await asyncio.gather(*[cb(json.loads(line)) for line in lines[:-1]])
-            buffer = lines[-1] if lines else ""
+from typing import Any, AsyncIterator, Callable, List, Optional
 
+from .fast_json import Buffer, loads as default_loads
+
+DEFAULT_MAX_LINE_SIZE = 64 * 1024 * 1024
+
+_WHITESPACE = frozenset(b" \t\r\n\f\v")
+
+class JsonlLineTooLongError(ValueError):
+    pass
+
+class JsonlDecoder:
+    # Splits a byte stream into JSON lines without decoding it to str first. Complete lines are parsed
+    # straight from a memoryview over the buffer; a newline byte never occurs inside a multi-byte UTF-8
+    # sequence, so a line cut between two network chunks is simply carried over to the next feed().
+
+    def __init__(
+            self,
+            loads: Optional[Callable[[Buffer], Any]] = None,
+            max_line_size: int = DEFAULT_MAX_LINE_SIZE,
+            accept: Optional[Callable[[memoryview], bool]] = None,
+            rejected: Optional[Callable[[memoryview], Any]] = None,
+    ):
+        self.loads = loads or default_loads
+        self.max_line_size = max_line_size
+        # Optional pre-filter on the raw line; rejected lines are never parsed. `rejected` can put an item
+        # of its own in their place.
+        self.accept = accept
+        self.rejected = rejected
+        self._buffer = bytearray()
+        self._scanned = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        buffer = self._buffer
+        buffer += chunk
+        items = []
+        start = 0
+        with memoryview(buffer) as view:
+            while True:
+                end = buffer.find(b"\n", max(start, self._scanned))
+                if end < 0:
+                    break
+                self._parse(view[start:end], items)
+                start = end + 1
+        if start:
+            del buffer[:start]
+        self._scanned = len(buffer)
+        if self._scanned > self.max_line_size:
+            raise JsonlLineTooLongError(f"JSONL line exceeds {self.max_line_size} bytes")
+        return items
+
+    def flush(self) -> List[Any]:
+        items = []
+        if self._buffer:
+            with memoryview(self._buffer) as view:
+                self._parse(view, items)
+            self._buffer.clear()
+            self._scanned = 0
+        return items
+
+    def _parse(self, line: memoryview, items: List[Any]) -> None:
+        # Blank lines are skipped; only lines starting with whitespace need a closer look.
+        if not line or (line[0] in _WHITESPACE and not line.tobytes().strip()):
+            return
+        if self.accept is not None and not self.accept(line):
+            if self.rejected is not None:
+                items.append(self.rejected(line))
+            return
+        items.append(self.loads(line))
+
+async def iter_jsonl(
+        response: aiohttp.ClientResponse,
+        loads: Optional[Callable[[Buffer], Any]] = None,
+        max_line_size: int = DEFAULT_MAX_LINE_SIZE,
+        accept: Optional[Callable[[memoryview], bool]] = None,
+        rejected: Optional[Callable[[memoryview], Any]] = None,
+) -> AsyncIterator[Any]:
+    decoder = JsonlDecoder(loads, max_line_size, accept, rejected)
     async for chunk in response.content.iter_any():
-        chunk_text = chunk.decode('utf-8')
-        buffer += chunk_text
-        await flush()
+        for item in decoder.feed(chunk):
+            yield item
+    for item in decoder.flush():
+        yield item
 
-    buffer += "\n"  # flush last line
-    await flush()
+async def jsonl(
+        response: aiohttp.ClientResponse,
+        cb,
+        loads: Optional[Callable[[Buffer], Any]] = None,
+        max_line_size: int = DEFAULT_MAX_LINE_SIZE,
+):
+    async for item in iter_jsonl(response, loads, max_line_size):
+        await cb(item)
@@ -0,0 +1,24 @@
+import sys
+
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+def lazy_exports(package: str, exports: Dict[str, Sequence[str]]) -> Tuple[List[str], Callable[[str], Any], Callable[[], List[str]]]:
+    # Returns `__all__`, `__getattr__` and `__dir__` for a package whose public names live in submodules
+    # (`exports` maps a relative module name to the names it defines). A submodule is only imported when
+    # one of its names is first accessed; the value is then stored on the package, so the lookup happens
+    # once. `from package import *` still imports everything.
+    modules = {name: module for module, names in exports.items() for name in names}
+
+    def __getattr__(name: str) -> Any:
+        module = modules.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(f".{module}", package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(modules))
+
+    return list(modules), __getattr__, __dir__
@@ -0,0 +1,209 @@
+import asyncio
+import inspect
+import io
+import mimetypes
+import mmap
+import os
+
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, NamedTuple, Optional, Union
+from aiohttp.payload import AsyncIterablePayload
+import aiohttp
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+class UploadProgress(NamedTuple):
+    field: str
+    sent: int
+    total: Optional[int]  # None when the size of the source is not known up front.
+
+ProgressCallback = Callable[[UploadProgress], Any]
+
+UploadSource = Union[
+    str,
+    os.PathLike,
+    bytes,
+    bytearray,
+    memoryview,
+    io.IOBase,
+    AsyncIterable[bytes],
+    Callable[[], AsyncIterable[bytes]],
+]
+
+class UploadPayload(AsyncIterablePayload):
+    # Streams the chunks of an UploadFile while still reporting a size, so the multipart body gets a
+    # Content-Length instead of falling back to chunked transfer encoding.
+
+    def __init__(self, value: AsyncIterable[bytes], size: Optional[int], **kwargs: Any):
+        super().__init__(value, **kwargs)
+        self._size = size
+
+class UploadFile:
+    # One file field of a multipart request. Files are read in `chunk_size` pieces while the request is
+    # being written, so nothing is held in memory beyond the chunk in flight. Paths, bytes, seekable file
+    # objects and async iterator factories can be read again from the start, which lets the transport
+    # retry the request; a plain async iterator can only be sent once.
+
+    def __init__(
+            self,
+            source: UploadSource,
+            filename: Optional[str] = None,
+            content_type: Optional[str] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            use_mmap: bool = False,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.source = source
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.filename = filename or UploadFile._guess_filename(source)
+        self.content_type = content_type or (
+            mimetypes.guess_type(self.filename)[0] if self.filename else None) or "application/octet-stream"
+        self._start = source.tell() if UploadFile._is_seekable(source) else None
+        self._used = False
+
+    @classmethod
+    def of(cls, value: Any) -> 'UploadFile':
+        return value if isinstance(value, UploadFile) else cls(value)
+
+    @property
+    def replayable(self) -> bool:
+        if isinstance(self.source, io.IOBase):
+            return self._start is not None
+        return not hasattr(self.source, "__aiter__")
+
+    @property
+    def size(self) -> Optional[int]:
+        source = self.source
+        if isinstance(source, (str, os.PathLike)):
+            return os.path.getsize(source)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return memoryview(source).nbytes
+        if self._start is not None and not isinstance(source, io.TextIOBase):
+            position = source.tell()
+            try:
+                return source.seek(0, io.SEEK_END) - self._start
+            finally:
+                source.seek(position)
+        return None
+
+    def payload(self, field: str, on_progress: Optional[ProgressCallback] = None) -> UploadPayload:
+        if self._used and not self.replayable:
+            raise RuntimeError(f"Upload for field {field!r} is an async iterator and has already been sent")
+        self._used = True
+        size = self.size
+        return UploadPayload(
+            self._report(self.chunks(), field, size, on_progress),
+            size,
+            content_type=self.content_type,
+            filename=self.filename or field,
+        )
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        source = self.source
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as file:
+                async for chunk in self._read_file(file, 0):
+                    yield chunk
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source).cast("B")
+            for offset in range(0, len(view), self.chunk_size):
+                yield view[offset:offset + self.chunk_size]
+        elif isinstance(source, io.IOBase):
+            if self._start is not None:
+                source.seek(self._start)
+            async for chunk in self._read_file(source, self._start or 0):
+                yield chunk
+        else:
+            iterable = source if hasattr(source, "__aiter__") else source()
+            async for chunk in iterable:
+                yield chunk.encode() if isinstance(chunk, str) else chunk
+
+    async def _read_file(self, file: Any, start: int) -> AsyncIterator[bytes]:
+        fileno = UploadFile._fileno(file)
+        if fileno is None:
+            # In-memory file objects: reading never blocks, so no executor round trip.
+            while chunk := file.read(self.chunk_size):
+                yield chunk.encode() if isinstance(chunk, str) else chunk
+            return
+        if self.use_mmap and os.fstat(fileno).st_size > start:
+            # Slicing the mapping copies straight out of the page cache without a read() syscall per chunk,
+            # which pays off for files that are already cached; cold files still fault pages in on the loop.
+            with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(start, len(mapped), self.chunk_size):
+                    yield mapped[offset:offset + self.chunk_size]
+            return
+        loop = asyncio.get_running_loop()
+        while chunk := await loop.run_in_executor(None, file.read, self.chunk_size):
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+
+    @staticmethod
+    async def _report(
+            chunks: AsyncIterator[bytes],
+            field: str,
+            total: Optional[int],
+            on_progress: Optional[ProgressCallback],
+    ) -> AsyncIterator[bytes]:
+        sent = 0
+        async for chunk in chunks:
+            yield chunk
+            if on_progress is not None:
+                sent += len(chunk)
+                result = on_progress(UploadProgress(field, sent, total))
+                if inspect.isawaitable(result):
+                    await result
+
+    @staticmethod
+    def _guess_filename(source: Any) -> Optional[str]:
+        if isinstance(source, (str, os.PathLike)):
+            return os.path.basename(os.fspath(source))
+        name = getattr(source, "name", None)
+        if isinstance(name, (str, os.PathLike)):
+            return os.path.basename(os.fspath(name))
+        return None
+
+    @staticmethod
+    def _is_seekable(source: Any) -> bool:
+        try:
+            return isinstance(source, io.IOBase) and source.seekable()
+        except (OSError, ValueError):
+            return False
+
+    @staticmethod
+    def _fileno(file: Any) -> Optional[int]:
+        try:
+            return file.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return None
+
+def is_upload(value: Any) -> bool:
+    # Plain strings stay ordinary form fields; pass a pathlib.Path or an UploadFile to send a file by path.
+    return not isinstance(value, str) and (
+        isinstance(value, (UploadFile, os.PathLike, bytes, bytearray, memoryview, io.IOBase))
+        or hasattr(value, "__aiter__"))
+
+def multipart_form(
+        fields: Dict[str, Any],
+        on_progress: Optional[ProgressCallback] = None,
+) -> Union[Callable[[], aiohttp.FormData], aiohttp.FormData]:
+    # Returns a factory when every upload can be re-read: each call starts the files over, which is what
+    # HttpTransport.send needs to replay the request. Otherwise the single-use FormData itself is returned
+    # and the transport sends the request only once.
+    uploads = {name: UploadFile.of(value) for name, value in fields.items() if is_upload(value)}
+
+    def build() -> aiohttp.FormData:
+        form_data = aiohttp.FormData()
+        for name, value in fields.items():
+            upload = uploads.get(name)
+            if upload is None:
+                form_data.add_field(name, value)
+            else:
+                form_data.add_field(
+                    name,
+                    upload.payload(name, on_progress),
+                    content_type=upload.content_type,
+                    filename=upload.filename or name,
+                )
+        return form_data
+
+    return build if all(upload.replayable for upload in uploads.values()) else build()
@@ -0,0 +1,141 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+# Imported on first use: numpy takes longer to import than the rest of the SDK.
+np: Any = None
+
+# Upper bound for the (queries x items) score block computed at once by EmbeddingMatrix.search.
+SEARCH_BLOCK_BYTES = 64 * 1024 * 1024
+
+def require_numpy() -> Any:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("Local vector search requires numpy: pip install 'integrail-sdk[vectors]'") from None
+        np = numpy
+    return np
+
+class SearchHit(NamedTuple):
+    index: int
+    id: str
+    score: float
+    text: str
+
+class EmbeddingMatrix:
+    # Embeddings of a memory store as one contiguous float32 array, one row per item, with ids and texts
+    # in side lists. 100k x 1536 embeddings take 600 MB here instead of several GB of Python floats.
+
+    def __init__(
+            self,
+            ids: List[str],
+            texts: List[str],
+            full_texts: List[str],
+            vectors: Any,
+            deleted: Optional[Sequence[int]] = None,
+    ):
+        # `vectors` may be a read-only np.memmap; it is used as is. Rows listed in `deleted` are skipped by
+        # lookups and searches, which lets a memory-mapped mirror drop items without rewriting the file.
+        numpy = require_numpy()
+        vectors = numpy.ascontiguousarray(vectors, dtype=numpy.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError(f"Expected {len(ids)} embedding rows, got an array of shape {vectors.shape}")
+        self.ids = ids
+        self.texts = texts
+        self.full_texts = full_texts
+        self.vectors = vectors
+        self.deleted = numpy.asarray(sorted(deleted), dtype=numpy.intp) if deleted else None
+        self._positions: Optional[Dict[str, int]] = None
+        self._inverse_norms: Optional[Any] = None
+
+    @classmethod
+    def from_items(cls, items: List[Dict[str, Any]]) -> 'EmbeddingMatrix':
+        # Takes the raw `items` of a memory list response. Each embedding list is copied into its row and
+        # dropped right away, so the Python floats are freed while the array fills up.
+        numpy = require_numpy()
+        dim = len(items[0]["embedding"]) if items else 0
+        vectors = numpy.empty((len(items), dim), dtype=numpy.float32)
+        ids, texts, full_texts = [], [], []
+        for row, item in enumerate(items):
+            embedding = item.pop("embedding")
+            if len(embedding) != dim:
+                raise ValueError(f"Embedding of item {item.get('_id')} has {len(embedding)} dimensions, expected {dim}")
+            vectors[row] = embedding
+            ids.append(item["_id"])
+            texts.append(item.get("embeddedDescription", ""))
+            full_texts.append(item.get("fullDescription", ""))
+        return cls(ids, texts, full_texts, vectors)
+
+    def __len__(self) -> int:
+        return len(self.ids) - (len(self.deleted) if self.deleted is not None else 0)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def index_of(self, item_id: str) -> Optional[int]:
+        if self._positions is None:
+            # Only live rows: a deleted row can share its id with the live row that replaced it.
+            deleted = set(self.deleted.tolist()) if self.deleted is not None else ()
+            self._positions = {item_id: row for row, item_id in enumerate(self.ids) if row not in deleted}
+        return self._positions.get(item_id)
+
+    def search(
+            self,
+            queries: Union[Sequence[float], Sequence[Sequence[float]], Any],
+            k: int = 10,
+            metric: str = "cosine",
+    ) -> Union[List[SearchHit], List[List[SearchHit]]]:
+        # Top-k items for one query vector, or for each row of a batch of queries. Scores are computed as
+        # one matrix product per block of queries; only the k best of each row are fully sorted.
+        numpy = require_numpy()
+        if metric not in ("cosine", "dot"):
+            raise ValueError(f"Unknown metric {metric!r}, expected 'cosine' or 'dot'")
+        query_array = numpy.asarray(queries, dtype=numpy.float32)
+        single = query_array.ndim == 1
+        query_array = numpy.atleast_2d(query_array)
+        if query_array.shape[1] != self.dim:
+            raise ValueError(f"Queries have {query_array.shape[1]} dimensions, the store has {self.dim}")
+        k = min(k, len(self))
+        if metric == "cosine":
+            query_array = query_array * EmbeddingMatrix._inverse(numpy.linalg.norm(query_array, axis=1))[:, None]
+        block = max(1, SEARCH_BLOCK_BYTES // max(1, 4 * len(self.ids)))
+        results: List[List[SearchHit]] = []
+        for start in range(0, len(query_array), block):
+            scores = query_array[start:start + block] @ self.vectors.T
+            if metric == "cosine":
+                scores *= self._item_inverse_norms()
+            if self.deleted is not None:
+                scores[:, self.deleted] = -numpy.inf
+            results.extend(self._top_k(scores, k))
+        return results[0] if single else results
+
+    def _item_inverse_norms(self) -> Any:
+        # Kept instead of a normalised copy of the matrix, which would double its memory.
+        if self._inverse_norms is None:
+            self._inverse_norms = EmbeddingMatrix._inverse(np.linalg.norm(self.vectors, axis=1))
+        return self._inverse_norms
+
+    def _top_k(self, scores: Any, k: int) -> Iterable[List[SearchHit]]:
+        if k <= 0:
+            return [[] for _ in range(len(scores))]
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        best = np.take_along_axis(candidates, order, axis=1)
+        best_scores = np.take_along_axis(candidate_scores, order, axis=1)
+        return [
+            [SearchHit(int(row), self.ids[row], float(score), self.texts[row]) for row, score in zip(rows, row_scores)]
+            for rows, row_scores in zip(best.tolist(), best_scores.tolist())
+        ]
+
+    @staticmethod
+    def _inverse(norms: Any) -> Any:
+        # Zero vectors score 0 instead of producing NaNs.
+        with np.errstate(divide="ignore"):
+            inverse = 1.0 / norms
+        inverse[~np.isfinite(inverse)] = 0.0
+        return inverse.astype(np.float32)
@@ -1,17 +1,71 @@
-from .account import *
-from .agent import *
-from .category import *
-from .chat_message import *
-from .data import *
-from .embedding import *
-from .execution import *
-from .fail_mode import *
-from .input import *
-from .media import *
-from .node_definition import *
-from .node_execution import *
-from .node import *
-from .output import *
-from .stats import *
-from .value import *
-from .vector_memory import *
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from integrail_sdk.helpers.lazy import lazy_exports
+
+# Modules are imported when one of their names is first used, so importing the package does not build
+# every model up front.
+__all__, __getattr__, __dir__ = lazy_exports(__name__, {
+    "agent": (
+        "AgentInput", "AgentOutput", "InlineAgent", "AgentIntegrationToken", "AgentIntegrations", "Agent",
+        "CloudAgent",
+    ),
+    "category": ("AgentCategory", "AgentSubcategory"),
+    "chat_message": ("ChatMessageRole", "ChatMessagePart", "ChatMessage"),
+    "data": (
+        "TypeName", "ExternalService", "InputRef", "TypePrimitive", "TypeComplex", "TypeMedia", "TypeRef",
+        "TypeExternal", "Type",
+    ),
+    "embedding": ("Embedding",),
+    "execution": (
+        "AgentExecutionStatus", "BaseEvent", "ExecutionEventOp", "InitEvent", "UpdateStatusEvent",
+        "OutputUpdateEvent", "NodeUpdateStatusEvent", "NodeOutputUpdateStatusEvent", "NodeOutputUpdateEvent",
+        "ExecutionEvent", "LazyPipeline", "AgentExecution",
+    ),
+    "execution_reducer": ("ExecutionReducer",),
+    "fail_mode": ("FailMode",),
+    "input": ("InputMetadata", "InputsMetadata"),
+    "lite_event": ("LiteEvent", "LiteOutputUpdateEvent", "LiteNodeOutputUpdateEvent", "parse_lite_event"),
+    "media": ("Image", "Audio", "Video", "File", "ThreeD"),
+    "node_catalog": ("NodeCatalog",),
+    "node_definition": (
+        "NodeDefinitionAvailabilityStatus", "NodeDefinitionAvailability", "BaseNodeDefinition",
+        "NodeDefinition",
+    ),
+    "node_execution": ("OutputStateStatus", "OutputState", "NodeExecutionStatus", "NodeExecutionState"),
+    "node": ("NodeInput", "Node", "NodeSelector"),
+    "output": ("OutputMetadata", "OutputsMetadata"),
+    "rope": ("TextRope",),
+    "stats": ("ExecutionStats", "AgentExecutionStats", "AggregatedExecutionStats"),
+    "validation": ("Check", "InputValidationError", "compile_type", "InputsValidator"),
+    "value": (
+        "BooleanValue", "NumberValue", "IntegerValue", "StringValue", "VectorValue", "ObjectValue",
+        "ListValue", "DictValue", "UrlImageValue", "Base64ImageValue", "ImageValue", "VideoValue",
+        "AudioValue", "ThreeDimensionalValue", "FileValue", "AuthTokenValue", "ValueUnion",
+        "TaggedValueUnion", "Value", "type_adapter",
+    ),
+    "vector_memory": ("VectorMemory",),
+})
+
+if TYPE_CHECKING:
+    from .account import *
+    from .agent import *
+    from .category import *
+    from .chat_message import *
+    from .data import *
+    from .embedding import *
+    from .execution import *
+    from .execution_reducer import *
+    from .fail_mode import *
+    from .input import *
+    from .lite_event import *
+    from .media import *
+    from .node_catalog import *
+    from .node_definition import *
+    from .node_execution import *
+    from .node import *
+    from .output import *
+    from .rope import *
+    from .stats import *
+    from .validation import *
+    from .value import *
+    from .vector_memory import *
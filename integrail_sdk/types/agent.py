@@ -1,9 +1,10 @@
-from pydantic import BaseModel, RootModel, Field
-from typing import List, Optional, Dict, Union
+from pydantic import BaseModel, RootModel, ConfigDict, Field, PrivateAttr
+from typing import Any, List, Mapping, Optional, Dict, Union
 
 from .data import Type
 from .node import Node
 from .node_execution import NodeExecutionState
+from .validation import InputsValidator
 
 class AgentInput(Type):
     name: str
@@ -15,15 +16,29 @@ class AgentOutput(Type):
     saveHistory: Optional[bool] = None
 
 class InlineAgent(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     inputs: List[AgentInput]
     outputs: List[AgentOutput]
     nodes: List[Node]
     mock: Optional[Dict[str, NodeExecutionState]] = None
+    _inputs_validator: Optional[InputsValidator] = PrivateAttr(default=None)
+
+    def inputs_validator(self) -> InputsValidator:
+        # Read from the private storage directly; pydantic's lookup of private attributes is slow.
+        validator = self.__pydantic_private__.get("_inputs_validator")
+        if validator is None:
+            validator = self.__pydantic_private__["_inputs_validator"] = InputsValidator(self.inputs)
+        return validator
+
+    def validate_inputs(self, inputs: Mapping[str, Any]) -> None:
+        self.inputs_validator().validate(inputs)
 
 class AgentIntegrationToken(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     tokenId: str
 
 class AgentIntegrations(RootModel):
+    model_config = ConfigDict(defer_build=True)
     root: Dict[str, List[AgentIntegrationToken]]
 
 class Agent(InlineAgent):
@@ -1,8 +1,8 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Any, List, Optional, Union
 from enum import Enum
 
-from .value import Value
+from .value import Value, type_adapter
 
 class ChatMessageRole(str, Enum):
     ASSISTANT = "assistant"
@@ -12,5 +12,14 @@ class ChatMessagePart(Value):
     __pydantic_extra__ = {'name': Optional[str]}
 
 class ChatMessage(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     role: ChatMessageRole
     parts: List[ChatMessagePart]
+
+    @staticmethod
+    def validate_history(messages: Union[str, bytes, List[Any]]) -> List['ChatMessage']:
+        # Validates a whole history in one call; JSON text is parsed by the validator itself.
+        adapter = type_adapter(List[ChatMessage])
+        if isinstance(messages, (str, bytes)):
+            return adapter.validate_json(messages)
+        return adapter.validate_python(messages)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr, ConfigDict
 from typing import Any, Dict, List, Optional, Union
 from enum import Enum
 
@@ -37,9 +37,11 @@ class ExternalService(str, Enum):
     STABILITY = "stability"
 
 class InputRef(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     ref: str
 
 class TypePrimitive(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName
     min: Optional[float] = None
     max: Optional[float] = None
@@ -48,6 +50,7 @@ class TypePrimitive(BaseModel):
     size: Optional[int] = None
 
 class TypeComplex(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName
     properties: Optional[Dict[str, 'Type']] = None
     elements: Optional['Type'] = None
@@ -58,16 +61,20 @@ class TypeComplex(BaseModel):
     variants: Optional[List['Type']] = None
 
 class TypeMedia(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName
 
 class TypeRef(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName
 
 class TypeExternal(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName
     service: ExternalService
 
 class Type(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName
     optional: Optional[bool] = None
     properties: Optional[Dict[str, 'Type']] = None
@@ -80,9 +87,20 @@ class Type(BaseModel):
     service: Optional[ExternalService] = None
     truncate: Optional[bool] = None
     ref: Optional[str] = None
+    _json_schema: Optional[Dict[str, Any]] = PrivateAttr(default=None)
 
     @staticmethod
     def to_json_schema(t: 'Type') -> Dict[str, Any]:
+        # Memoised on the instance; the returned schema is shared and must not be modified. The private
+        # storage is read directly because pydantic's attribute lookup for private fields is slow.
+        private = t.__pydantic_private__
+        schema = private.get("_json_schema")
+        if schema is None:
+            schema = private["_json_schema"] = Type._build_json_schema(t)
+        return schema
+
+    @staticmethod
+    def _build_json_schema(t: 'Type') -> Dict[str, Any]:
         if t.type == TypeName.BOOLEAN:
             return {"type": "boolean"}
         elif t.type == TypeName.NUMBER:
@@ -147,6 +165,4 @@ class Type(BaseModel):
         elif t.type == TypeName.AUTH_TOKEN:
             return {"type": "object"}
 
-# To handle forward references
-Type.update_forward_refs()
-TypeComplex.update_forward_refs()
\ No newline at end of file
+# Forward references are resolved when the deferred models are first built.
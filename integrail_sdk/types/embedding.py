@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List
 
 class Embedding(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     id: str = Field(alias="_id")
     embeddedDescription: str
     fullDescription: str
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, RootModel, Field
+from pydantic import BaseModel, RootModel, ConfigDict, Field, PrivateAttr, model_serializer
 from typing import Any, Dict, List, Optional, Union, Literal, Callable
+from copy import copy
 from enum import Enum
 from datetime import datetime
 
@@ -20,6 +21,7 @@ class AgentExecutionStatus(str, Enum):
     ERROR = "error"
 
 class BaseEvent(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     createdAt: datetime
 
 class ExecutionEventOp(str, Enum):
@@ -70,6 +72,7 @@ class NodeOutputUpdateEvent(BaseEvent):
     append: Optional[bool] = None
 
 class ExecutionEvent(RootModel):
+    model_config = ConfigDict(defer_build=True)
     root: Union[
         InitEvent,
         UpdateStatusEvent,
@@ -79,7 +82,20 @@ class ExecutionEvent(RootModel):
         NodeOutputUpdateEvent,
     ] = Field(discriminator="op")
 
+class LazyPipeline:
+    # Raw pipeline JSON validated on first access and shared by all copies of the execution.
+    def __init__(self, raw: Any):
+        self.raw = raw
+        self.value: Optional[Agent] = None
+
+    def get(self) -> Agent:
+        if self.value is None:
+            self.value = Agent.model_validate(self.raw)
+            self.raw = None
+        return self.value
+
 class AgentExecution(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     id: str = Field(alias="_id")
     status: AgentExecutionStatus
     updatedAt: datetime
@@ -98,6 +114,98 @@ class AgentExecution(BaseModel):
     errors: Optional[List[Any]] = Field(alias="_errors", default=None)
     parentExecutionId: Optional[str] = None
 
+    # Fields computed on first read (see with_lazy), and the ExecutionReducer state a reducer snapshot was
+    # taken from, which lets apply_event continue from it instead of starting over.
+    _lazy: Optional[Dict[str, Callable[[], Any]]] = PrivateAttr(default=None)
+    _reducer: Any = PrivateAttr(default=None)
+
+    def __getattr__(self, name: str) -> Any:
+        lazy = (self.__pydantic_private__ or {}).get("_lazy")
+        if lazy is not None and name in lazy:
+            value = self.__dict__[name] = lazy[name]()
+            return value
+        return super().__getattr__(name)
+
+    def with_lazy(self, update: Dict[str, Any], lazy: Dict[str, Callable[[], Any]]) -> 'AgentExecution':
+        # Copy with `update` applied and the fields of `lazy` left out until they are read. Comparing,
+        # printing, copying and serializing the copy compute them first, so it behaves like any other.
+        # Built like model_copy does, which is too slow for a snapshot per streamed event.
+        values = {**self.__dict__, **update}
+        for name in lazy:
+            values.pop(name, None)
+        private = self.__pydantic_private__ or {}
+        inherited = private.get("_lazy") or {}
+        execution = AgentExecution.__new__(type(self))
+        object.__setattr__(execution, "__dict__", values)
+        object.__setattr__(execution, "__pydantic_extra__", copy(self.__pydantic_extra__))
+        object.__setattr__(execution, "__pydantic_fields_set__", self.__pydantic_fields_set__ | update.keys() | lazy.keys())
+        object.__setattr__(execution, "__pydantic_private__", {
+            **private,
+            "_lazy": {**{name: f for name, f in inherited.items() if name not in values}, **lazy},
+            "_reducer": None,
+        })
+        return execution
+
+    @staticmethod
+    def validate_lazy(data: Dict[str, Any]) -> 'AgentExecution':
+        # Validates everything except `pipeline`, which is only validated once it is read or serialized.
+        execution = AgentExecution.model_validate({**data, "pipeline": _PIPELINE_PLACEHOLDER})
+        return execution.with_lazy({}, {"pipeline": LazyPipeline(data.get("pipeline")).get})
+
+    def _resolve_lazy(self) -> None:
+        # Also puts the fields back in their declared order, which serialization follows.
+        private = self.__pydantic_private__
+        lazy = private.get("_lazy") if private else None
+        if not lazy:
+            return
+        for name in lazy:
+            if name not in self.__dict__:
+                getattr(self, name)
+        values = self.__dict__
+        object.__setattr__(self, "__dict__", {name: values[name] for name in type(self).model_fields if name in values})
+        private["_lazy"] = None
+
+    @model_serializer(mode="wrap")
+    def serialize_lazy(self, handler):
+        self._resolve_lazy()
+        return handler(self)
+
+    def __eq__(self, other: Any) -> bool:
+        # Private attributes only say how the execution was built, not what it holds.
+        if not isinstance(other, AgentExecution):
+            return super().__eq__(other)
+        self._resolve_lazy()
+        other._resolve_lazy()
+        return (
+            type(self) is type(other)
+            and self.__dict__ == other.__dict__
+            and (self.__pydantic_extra__ or {}) == (other.__pydantic_extra__ or {})
+        )
+
+    def __repr_args__(self):
+        self._resolve_lazy()
+        return super().__repr_args__()
+
+    def __iter__(self):
+        self._resolve_lazy()
+        return super().__iter__()
+
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None) -> 'AgentExecution':
+        self._resolve_lazy()
+        memo = {} if memo is None else memo
+        for name in ("_lazy", "_reducer"):
+            value = (self.__pydantic_private__ or {}).get(name)
+            if value is not None:
+                memo[id(value)] = None
+        return super().__deepcopy__(memo)
+
+    def __getstate__(self) -> Dict[Any, Any]:
+        self._resolve_lazy()
+        state = super().__getstate__()
+        if state["__pydantic_private__"]:
+            state["__pydantic_private__"] = {**state["__pydantic_private__"], "_lazy": None, "_reducer": None}
+        return state
+
     @staticmethod
     def is_ended(execution: 'AgentExecution') -> bool:
         return execution.status in {AgentExecutionStatus.FINISHED, AgentExecutionStatus.ERROR}
@@ -158,11 +266,9 @@ class AgentExecution(BaseModel):
     def apply_events(execution: 'AgentExecution') -> 'AgentExecution':
         if execution.events is None:
             return execution
-        events = sorted(execution.events, key=lambda e: e.createdAt)
-        for event in events:
-            execution = AgentExecution.apply_event(execution, event)
-        execution = execution.model_copy(update={"events": []})
-        return execution
+        from .execution_reducer import ExecutionReducer
+
+        return ExecutionReducer(execution).snapshot()
 
     @staticmethod
     def apply_event(execution: 'AgentExecution', event: Union[InitEvent, UpdateStatusEvent, OutputUpdateEvent, NodeUpdateStatusEvent, NodeOutputUpdateStatusEvent, NodeOutputUpdateEvent]) -> 'AgentExecution':
@@ -177,57 +283,31 @@ class AgentExecution(BaseModel):
         elif isinstance(event, (NodeOutputUpdateStatusEvent, NodeOutputUpdateEvent)):
             return AgentExecution.apply_node_output_event(execution, event)
 
+    # The apply_* steps run through an ExecutionReducer. An execution returned by one of them carries the
+    # reducer's working state, so applying the next event to it appends text in O(chunk) as well.
+
     @staticmethod
     def apply_agent_event(execution: 'AgentExecution', event: UpdateStatusEvent) -> 'AgentExecution':
-        return AgentExecution.update(
-            execution,
-            lambda e: e.model_copy(
-                update={
-                    "status": event.status,
-                    "message": event.message or e.message,
-                    "_errors": event.errors or e.errors,
-                }
-            ),
-            lambda: event.createdAt,
-        )
+        return AgentExecution._reduce(execution, event)
 
     @staticmethod
     def apply_agent_output_event(execution: 'AgentExecution', event: OutputUpdateEvent) -> 'AgentExecution':
-        return AgentExecution.update_agent_output(
-            execution,
-            event.output,
-            lambda output_value: f"{output_value or ''}{event.value}" if event.append else event.value,
-            lambda: event.createdAt,
-        )
+        return AgentExecution._reduce(execution, event)
 
     @staticmethod
     def apply_node_event(execution: 'AgentExecution', event: NodeUpdateStatusEvent) -> 'AgentExecution':
-        return AgentExecution.update_node(
-            execution,
-            event.nodeId,
-            lambda node: node.copy(
-                update={
-                    "status": event.status,
-                    "retries": event.retries or node.retries,
-                    "message": event.message or node.message,
-                    "errors": event.errors or node.errors,
-                    "stats": event.stats or node.stats,
-                }
-            ),
-            lambda: event.createdAt,
-        )
+        return AgentExecution._reduce(execution, event)
 
     @staticmethod
     def apply_node_output_event(execution: 'AgentExecution', event: Union[NodeOutputUpdateStatusEvent, NodeOutputUpdateEvent]) -> 'AgentExecution':
-        return AgentExecution.update_node_output(
-            execution,
-            event.nodeId,
-            event.output,
-            lambda output_state: output_state.copy(
-                update={
-                    "status": event.status,
-                    "value": f"{output_state.value or ''}{event.value}" if isinstance(event, NodeOutputUpdateEvent) and event.append else event.value,
-                }
-            ) if output_state else None,
-            lambda: event.createdAt,
-        )
+        return AgentExecution._reduce(execution, event)
+
+    @staticmethod
+    def _reduce(execution: 'AgentExecution', event: Any) -> 'AgentExecution':
+        from .execution_reducer import ExecutionReducer
+
+        reducer = ExecutionReducer.resume(execution)
+        reducer.apply(event)
+        return reducer.snapshot()
+
+_PIPELINE_PLACEHOLDER = Agent.model_construct()
@@ -0,0 +1,278 @@
+import weakref
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from datetime import datetime
+
+from .lite_event import LiteEvent, _parse_datetime
+from .execution import (
+    AgentExecution,
+    AgentExecutionStatus,
+    ExecutionEvent,
+    ExecutionEventOp,
+    InitEvent,
+    NodeOutputUpdateEvent,
+    NodeOutputUpdateStatusEvent,
+    NodeUpdateStatusEvent,
+    OutputUpdateEvent,
+    UpdateStatusEvent,
+)
+from .node_execution import NodeExecutionState, OutputState
+from .rope import TextRope
+from .stats import ExecutionStats
+
+class ExecutionReducer:
+    # Incremental counterpart of AgentExecution.apply_events: every event is applied in O(1) to working
+    # state, and snapshot() only captures that state. The snapshot computes its outputs, node states and
+    # timestamps when they are first read, so building one per event stays cheap however long the outputs
+    # get. Appended text is kept in TextRopes, which snapshots show as plain strings; each version is
+    # joined at most once. Node and output states are replaced rather than mutated, and the dicts holding
+    # them are copied before the first change after a snapshot, so snapshots handed out earlier never
+    # change. Likewise the createdAt of lite events is kept as received and only parsed when read.
+
+    def __init__(self, execution: AgentExecution):
+        self.reset(execution)
+
+    @classmethod
+    def from_init(cls, event: Union[InitEvent, ExecutionEvent]) -> 'ExecutionReducer':
+        if isinstance(event, ExecutionEvent):
+            event = event.root
+        return cls(AgentExecution.init(event))
+
+    @classmethod
+    def resume(cls, execution: AgentExecution) -> 'ExecutionReducer':
+        # Continues from the working state behind a snapshot of another reducer, so its ropes keep
+        # growing in place; any other execution starts a new reducer.
+        reducer = (execution.__pydantic_private__ or {}).get("_reducer")
+        # Copies of the snapshot carry the same reducer but may hold other values.
+        if reducer is not None and reducer._owner is not None and reducer._owner() is execution:
+            return reducer._fork()
+        return cls(execution)
+
+    def reset(self, execution: AgentExecution) -> None:
+        self._base = execution
+        self._status = execution.status
+        self._message = execution.message
+        self._errors = execution.errors
+        self._updated_at: Any = execution.updatedAt
+        self._started_at = execution.startedAt
+        self._finished_at: Any = execution.finishedAt
+        self._outputs: Dict[str, Any] = dict(execution.outputs or {})
+        self._state: Dict[str, NodeExecutionState] = dict(execution.state)
+        # Node output events that arrived before the status event of their node, per node.
+        self._waiting: Dict[str, List[Any]] = {}
+        # True while a snapshot shares the dicts above; they are copied before the next change.
+        self._shared = False
+        # node id -> (working node state, the same state as snapshots show it).
+        self._published: Dict[str, Tuple[NodeExecutionState, NodeExecutionState]] = {}
+        self._stats = execution.stats
+        self._last_event_at: Any = None
+        self._owner: Optional[weakref.ref] = None
+        self._snapshot: Optional[AgentExecution] = execution if not execution.events else None
+        if execution.events:
+            self.apply_events(execution.events)
+
+    @property
+    def execution_id(self) -> str:
+        return self._base.id
+
+    @property
+    def status(self) -> AgentExecutionStatus:
+        return self._status
+
+    @property
+    def last_event_at(self) -> Optional[datetime]:
+        self._last_event_at = _parse_optional_datetime(self._last_event_at)
+        return self._last_event_at
+
+    def is_ended(self) -> bool:
+        return self._status in {AgentExecutionStatus.FINISHED, AgentExecutionStatus.ERROR}
+
+    def output(self, name: str) -> Any:
+        return _text(self._outputs.get(name))
+
+    def node(self, node_id: str) -> Optional[NodeExecutionState]:
+        node = self._state.get(node_id)
+        return self._published_node(node_id, node) if node is not None else None
+
+    def delta(self, output: str, node_id: Optional[str] = None) -> str:
+        # The text the latest append added to an agent output, or to a node output with `node_id`.
+        if node_id is None:
+            value = self._outputs.get(output)
+        else:
+            node = self._state.get(node_id)
+            output_state = (node.outputs or {}).get(output) if node is not None else None
+            value = output_state.value if output_state is not None else None
+        return value.delta if isinstance(value, TextRope) else ""
+
+    def apply(self, event: Any) -> None:
+        if isinstance(event, ExecutionEvent):
+            event = event.root
+        handler = self._handlers.get(event.op)
+        if handler is None:
+            return
+        if self._shared and event.op != ExecutionEventOp.INIT:
+            self._unshare()
+        handler(self, event)
+        if event.op != ExecutionEventOp.INIT:
+            self._touch(_created_at(event))
+        self._snapshot = None
+
+    def apply_events(self, events: Iterable[Any]) -> None:
+        events = [e.root if isinstance(e, ExecutionEvent) else e for e in events]
+        # Events normally arrive in order; only pay for sorting when they do not.
+        if any(events[i].createdAt < events[i - 1].createdAt for i in range(1, len(events))):
+            events = sorted(events, key=lambda e: e.createdAt)
+        for event in events:
+            self.apply(event)
+
+    def snapshot(self) -> AgentExecution:
+        if self._snapshot is None:
+            # The snapshot reads from a fork of the working state, which this reducer stops sharing before
+            # its next change.
+            fork = self._fork()
+            lazy = {"outputs": fork._snapshot_outputs, "state": fork._snapshot_state}
+            update = {
+                "status": self._status,
+                "message": self._message,
+                "errors": self._errors,
+                "startedAt": self._started_at,
+                "stats": self._stats,
+                "events": [],
+            }
+            for name, value in (("updatedAt", self._updated_at), ("finishedAt", self._finished_at)):
+                if value is None or isinstance(value, datetime):
+                    update[name] = value
+                else:
+                    lazy[name] = lambda value=value: _parse_datetime(value)
+            snapshot = self._base.with_lazy(update, lazy)
+            snapshot.__pydantic_private__["_reducer"] = fork
+            # A weak reference, so that snapshots are freed without waiting for the cycle collector.
+            fork._owner = weakref.ref(snapshot)
+            self._snapshot = snapshot
+        return self._snapshot
+
+    def _fork(self) -> 'ExecutionReducer':
+        fork = ExecutionReducer.__new__(ExecutionReducer)
+        fork.__dict__.update(self.__dict__)
+        fork._snapshot = fork._owner = None
+        self._shared = fork._shared = True
+        return fork
+
+    def _unshare(self) -> None:
+        self._outputs = dict(self._outputs)
+        self._state = dict(self._state)
+        self._waiting = {node_id: list(events) for node_id, events in self._waiting.items()}
+        self._shared = False
+
+    def _snapshot_outputs(self) -> Dict[str, Any]:
+        return {name: _text(value) for name, value in self._outputs.items()}
+
+    def _snapshot_state(self) -> Dict[str, NodeExecutionState]:
+        return {node_id: self._published_node(node_id, node) for node_id, node in self._state.items()}
+
+    def _published_node(self, node_id: str, node: NodeExecutionState) -> NodeExecutionState:
+        published = self._published.get(node_id)
+        if published is None or published[0] is not node:
+            published = self._published[node_id] = (node, _publish(node))
+        return published[1]
+
+    def _touch(self, timestamp: Any) -> None:
+        self._last_event_at = timestamp
+        self._updated_at = timestamp
+        self._started_at = self._started_at or datetime.now()
+        if self.is_ended() and self._finished_at is None:
+            self._finished_at = timestamp
+        if self._stats is None:
+            self._recompute_stats()
+
+    def _recompute_stats(self) -> None:
+        stats: Dict[str, Any] = {}
+        for node_state in self._state.values():
+            if node_state.stats:
+                for stats_key, value in node_state.stats.model_dump(by_alias=True).items():
+                    stats[stats_key] = (stats.get(stats_key) or 0) + (value or 0)
+        self._stats = ExecutionStats(**stats)
+
+    def _apply_init(self, event: InitEvent) -> None:
+        self.reset(AgentExecution.init(event))
+
+    def _apply_agent_event(self, event: UpdateStatusEvent) -> None:
+        self._status = event.status
+        self._message = event.message or self._message
+        self._errors = event.errors or self._errors
+
+    def _apply_agent_output_event(self, event: OutputUpdateEvent) -> None:
+        if event.append:
+            self._outputs[event.output] = TextRope.concat(self._outputs.get(event.output), event.value)
+        else:
+            self._outputs[event.output] = event.value
+
+    def _apply_node_event(self, event: NodeUpdateStatusEvent) -> None:
+        node = self._state.get(event.nodeId)
+        if node is None:
+            node = NodeExecutionState(status=event.status, updatedAt=event.createdAt, retries=event.retries or 0)
+        self._state[event.nodeId] = node.model_copy(update={
+            "status": event.status,
+            "retries": event.retries or node.retries,
+            "message": event.message or node.message,
+            "errors": event.errors or node.errors,
+            "stats": event.stats or node.stats,
+            "updatedAt": event.createdAt,
+        })
+        waiting = self._waiting.pop(event.nodeId, None)
+        if waiting:
+            for early in sorted(waiting, key=lambda e: e.createdAt):
+                self._apply_node_output_event(early)
+        if event.stats:
+            # Stats only change on node status events, so token events never pay for the aggregation.
+            self._recompute_stats()
+
+    def _apply_node_output_event(self, event: Union[NodeOutputUpdateStatusEvent, NodeOutputUpdateEvent]) -> None:
+        node = self._state.get(event.nodeId)
+        if node is None:
+            # Applied once the status event of the node arrives.
+            self._waiting.setdefault(event.nodeId, []).append(event)
+            return
+        outputs = dict(node.outputs or {})
+        output_state = outputs.get(event.output)
+        if event.op == ExecutionEventOp.NODE_OUTPUT_UPDATE_STATUS:
+            value = output_state.value if output_state else None
+        elif event.append:
+            value = TextRope.concat(output_state.value if output_state else None, event.value)
+        else:
+            value = event.value
+        outputs[event.output] = OutputState.model_construct(status=event.status, value=value)
+        self._state[event.nodeId] = node.model_copy(update={"outputs": outputs, "updatedAt": _created_at(event)})
+
+    _handlers = {
+        ExecutionEventOp.INIT: _apply_init,
+        ExecutionEventOp.UPDATE_STATUS: _apply_agent_event,
+        ExecutionEventOp.OUTPUT_UPDATE: _apply_agent_output_event,
+        ExecutionEventOp.NODE_UPDATE_STATUS: _apply_node_event,
+        ExecutionEventOp.NODE_OUTPUT_UPDATE_STATUS: _apply_node_output_event,
+        ExecutionEventOp.NODE_OUTPUT_UPDATE: _apply_node_output_event,
+    }
+
+def _created_at(event: Any) -> Any:
+    # The createdAt of an event without parsing it; lite events hold the string they were received with.
+    return event._created_at if isinstance(event, LiteEvent) else event.createdAt
+
+def _parse_optional_datetime(value: Any) -> Optional[datetime]:
+    return _parse_datetime(value) if value is not None else None
+
+def _text(value: Any) -> Any:
+    return str(value) if isinstance(value, TextRope) else value
+
+def _publish(node: NodeExecutionState) -> NodeExecutionState:
+    # Replaces the ropes of a working node state with the text they hold and parses its updatedAt.
+    update: Dict[str, Any] = {}
+    if not isinstance(node.updatedAt, datetime):
+        update["updatedAt"] = _parse_datetime(node.updatedAt)
+    outputs = node.outputs
+    if outputs and any(state is not None and isinstance(state.value, TextRope) for state in outputs.values()):
+        update["outputs"] = {
+            name: OutputState.model_construct(status=state.status, value=str(state.value))
+            if state is not None and isinstance(state.value, TextRope) else state
+            for name, state in outputs.items()
+        }
+    return node.model_copy(update=update) if update else node
@@ -1,8 +1,9 @@
-from pydantic import RootModel
-from typing import Any, List, Optional
+from pydantic import PrivateAttr, RootModel, ConfigDict
+from typing import Any, List, Mapping, Optional
 
 from .data import Type
 from .fail_mode import FailMode
+from .validation import InputsValidator
 
 class InputMetadata(Type):
     name: str
@@ -15,4 +16,16 @@ class InputMetadata(Type):
     failMode: Optional[FailMode] = None
 
 class InputsMetadata(RootModel):
-    root: List[InputMetadata]
\ No newline at end of file
+    model_config = ConfigDict(defer_build=True)
+    root: List[InputMetadata]
+    _validator: Optional[InputsValidator] = PrivateAttr(default=None)
+
+    def validator(self) -> InputsValidator:
+        # Read from the private storage directly; pydantic's lookup of private attributes is slow.
+        validator = self.__pydantic_private__.get("_validator")
+        if validator is None:
+            validator = self.__pydantic_private__["_validator"] = InputsValidator(self.root)
+        return validator
+
+    def validate_inputs(self, inputs: Mapping[str, Any]) -> None:
+        self.validator().validate(inputs)
\ No newline at end of file
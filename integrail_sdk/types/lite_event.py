@@ -0,0 +1,98 @@
+from datetime import datetime
+from pydantic import TypeAdapter
+from typing import Any, Dict, Optional, Tuple
+
+from .execution import ExecutionEvent, ExecutionEventOp
+from .node_execution import OutputStateStatus
+
+_DATETIME = TypeAdapter(datetime)
+_OUTPUT_STATUSES = {status.value: status for status in OutputStateStatus}
+
+def _parse_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return _DATETIME.validate_python(value)
+
+class LiteEvent:
+    # Unvalidated stand-in for the token events of a stream, which make up nearly all of its events. Fields
+    # are plain slots and createdAt is only parsed when read. `root` returns the event itself, so code
+    # written against ExecutionEvent (`event.root.op`, `event.root.value`) works with either.
+    __slots__ = ("_created_at",)
+    op: ExecutionEventOp
+    _fields: Tuple[str, ...] = ()
+
+    @property
+    def root(self) -> 'LiteEvent':
+        return self
+
+    @property
+    def createdAt(self) -> datetime:
+        created_at = self._created_at
+        if not isinstance(created_at, datetime):
+            created_at = self._created_at = _parse_datetime(created_at)
+        return created_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self._fields}
+        data["op"] = self.op.value
+        data["createdAt"] = self._created_at
+        return data
+
+    def to_event(self) -> ExecutionEvent:
+        return ExecutionEvent.model_validate(self.to_dict())
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields}, createdAt={self._created_at!r})"
+
+class LiteOutputUpdateEvent(LiteEvent):
+    __slots__ = ("output", "value", "append")
+    op = ExecutionEventOp.OUTPUT_UPDATE
+    _fields = ("output", "value", "append")
+
+    def __init__(self, created_at: Any, output: str, value: Any, append: Optional[bool] = None):
+        self._created_at = created_at
+        self.output = output
+        self.value = value
+        self.append = append
+
+    def merged(self, value: Any) -> 'LiteOutputUpdateEvent':
+        return LiteOutputUpdateEvent(self._created_at, self.output, value, self.append)
+
+class LiteNodeOutputUpdateEvent(LiteEvent):
+    __slots__ = ("nodeId", "output", "status", "value", "append")
+    op = ExecutionEventOp.NODE_OUTPUT_UPDATE
+    _fields = ("nodeId", "output", "status", "value", "append")
+
+    def __init__(self, created_at: Any, node_id: str, output: str, status: OutputStateStatus, value: Any, append: Optional[bool] = None):
+        self._created_at = created_at
+        self.nodeId = node_id
+        self.output = output
+        self.status = status
+        self.value = value
+        self.append = append
+
+    def merged(self, value: Any) -> 'LiteNodeOutputUpdateEvent':
+        return LiteNodeOutputUpdateEvent(self._created_at, self.nodeId, self.output, self.status, value, self.append)
+
+def parse_lite_event(data: Dict[str, Any]) -> Optional[LiteEvent]:
+    # Returns None for other ops and for data that does not have the expected shape; those events are
+    # left to the full ExecutionEvent validation.
+    op = data.get("op")
+    try:
+        if op == "node.output.update":
+            status = _OUTPUT_STATUSES.get(data["status"])
+            if status is None:
+                return None
+            return LiteNodeOutputUpdateEvent(data["createdAt"], data["nodeId"], data["output"], status, data["value"], data.get("append"))
+        if op == "output.update":
+            return LiteOutputUpdateEvent(data["createdAt"], data["output"], data["value"], data.get("append"))
+    except KeyError:
+        pass
+    return None
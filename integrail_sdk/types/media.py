@@ -1,4 +1,4 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, ConfigDict
 from typing import Union
 
 from .data import TypeName
@@ -10,6 +10,7 @@ class Image(BaseModel):
 
     class Config:
         validate_assignment = True
+        defer_build = True
 
     @classmethod
     def __get_validators__(cls):
@@ -22,18 +23,22 @@ class Image(BaseModel):
         return v
 
 class Audio(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.AUDIO
     url: HttpUrl
 
 class Video(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.VIDEO
     url: HttpUrl
 
 class File(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.FILE
     url: HttpUrl
     fileName: str
 
 class ThreeD(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.THREE_DIMENSIONAL
     url: HttpUrl
\ No newline at end of file
@@ -1,11 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Any, List, Optional
 
 class NodeInput(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     name: str
     value: Optional[Any] = None
 
 class Node(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     id: str
     name: str
     inputs: Optional[List[NodeInput]] = None
@@ -16,4 +18,5 @@ class Node(BaseModel):
     inputsRef: Optional[str] = None  # Deprecated
 
 class NodeSelector(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     nodeId: str
\ No newline at end of file
@@ -0,0 +1,151 @@
+import re
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from .category import AgentCategory, AgentSubcategory
+from .data import Type, TypeName
+from .node_definition import NodeDefinition, NodeDefinitionAvailabilityStatus
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def _tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+def _type_names(t: Type) -> Iterator[TypeName]:
+    # A oneOf input accepts each of its variants, so those are indexed along with the oneOf itself.
+    yield t.type
+    if t.type == TypeName.ONE_OF and t.variants:
+        for variant in t.variants:
+            if isinstance(variant, Type):
+                yield from _type_names(variant)
+
+class NodeCatalog:
+    # Read-only view over a node definition list with hash indexes for exact lookups and an inverted index
+    # over title/description words for search. Indexes hold positions into `nodes`, so filters combine
+    # as set intersections and results keep the order of the original list.
+
+    def __init__(self, nodes: Iterable[NodeDefinition]):
+        self.nodes: List[NodeDefinition] = list(nodes)
+        self._by_name: Dict[str, int] = {}
+        self._by_short_id: Dict[str, int] = {}
+        self._by_category: Dict[AgentCategory, Set[int]] = defaultdict(set)
+        self._by_subcategory: Dict[AgentSubcategory, Set[int]] = defaultdict(set)
+        self._by_status: Dict[NodeDefinitionAvailabilityStatus, Set[int]] = defaultdict(set)
+        self._by_input_type: Dict[TypeName, Set[int]] = defaultdict(set)
+        self._by_output_type: Dict[TypeName, Set[int]] = defaultdict(set)
+        self._title_words: Dict[str, Set[int]] = defaultdict(set)
+        self._text_words: Dict[str, Set[int]] = defaultdict(set)
+        self._hidden: Set[int] = set()
+        for position, node in enumerate(self.nodes):
+            self._index(position, node)
+        self._vocabulary = sorted(self._text_words)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __iter__(self) -> Iterator[NodeDefinition]:
+        return iter(self.nodes)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def get(self, name: str) -> Optional[NodeDefinition]:
+        position = self._by_name.get(name)
+        return self.nodes[position] if position is not None else None
+
+    def by_short_id(self, short_id: str) -> Optional[NodeDefinition]:
+        position = self._by_short_id.get(short_id)
+        return self.nodes[position] if position is not None else None
+
+    def by_category(self, category: AgentCategory) -> List[NodeDefinition]:
+        return self._select(self._by_category.get(AgentCategory(category), set()))
+
+    def by_subcategory(self, subcategory: AgentSubcategory) -> List[NodeDefinition]:
+        return self._select(self._by_subcategory.get(AgentSubcategory(subcategory), set()))
+
+    def by_status(self, status: NodeDefinitionAvailabilityStatus) -> List[NodeDefinition]:
+        return self._select(self._by_status.get(NodeDefinitionAvailabilityStatus(status), set()))
+
+    def accepting(self, type_name: TypeName) -> List[NodeDefinition]:
+        return self._select(self._by_input_type.get(TypeName(type_name), set()))
+
+    def producing(self, type_name: TypeName) -> List[NodeDefinition]:
+        return self._select(self._by_output_type.get(TypeName(type_name), set()))
+
+    def search(
+            self,
+            text: Optional[str] = None,
+            category: Optional[AgentCategory] = None,
+            subcategory: Optional[AgentSubcategory] = None,
+            status: Optional[NodeDefinitionAvailabilityStatus] = None,
+            accepts: Optional[TypeName] = None,
+            produces: Optional[TypeName] = None,
+            include_hidden: bool = False,
+            limit: Optional[int] = None,
+    ) -> List[NodeDefinition]:
+        # Every word of `text` has to occur in the title, description or name of a node; the last word also
+        # matches as a prefix so partially typed queries work. Matches are ranked by how many words hit the
+        # title, then kept in catalog order.
+        candidates: Optional[Set[int]] = None
+        filters = [
+            (self._by_category, category and AgentCategory(category)),
+            (self._by_subcategory, subcategory and AgentSubcategory(subcategory)),
+            (self._by_status, status and NodeDefinitionAvailabilityStatus(status)),
+            (self._by_input_type, accepts and TypeName(accepts)),
+            (self._by_output_type, produces and TypeName(produces)),
+        ]
+        for index, key in filters:
+            if key:
+                candidates = NodeCatalog._intersect(candidates, index.get(key, set()))
+        words = _tokenize(text)
+        for i, word in enumerate(words):
+            matches = self._prefix_matches(word) if i == len(words) - 1 else self._text_words.get(word, set())
+            candidates = NodeCatalog._intersect(candidates, matches)
+        if candidates is None:
+            candidates = set(range(len(self.nodes)))
+        if not include_hidden:
+            candidates = candidates - self._hidden
+        positions = sorted(candidates)
+        if words:
+            positions.sort(key=lambda p: -sum(p in self._title_words.get(word, ()) for word in words))
+        return [self.nodes[p] for p in positions[:limit]]
+
+    def _index(self, position: int, node: NodeDefinition) -> None:
+        self._by_name[node.name] = position
+        if node.shortId:
+            self._by_short_id[node.shortId] = position
+        self._by_category[node.category].add(position)
+        if node.subcategory:
+            self._by_subcategory[node.subcategory].add(position)
+        self._by_status[node.availability.status].add(position)
+        if node.hidden:
+            self._hidden.add(position)
+        for input_metadata in node.inputs.root:
+            for type_name in _type_names(input_metadata):
+                self._by_input_type[type_name].add(position)
+        for output_metadata in node.outputs.root:
+            for type_name in _type_names(output_metadata):
+                self._by_output_type[type_name].add(position)
+        for word in _tokenize(node.title):
+            self._title_words[word].add(position)
+            self._text_words[word].add(position)
+        for word in _tokenize(node.description) + _tokenize(node.name):
+            self._text_words[word].add(position)
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        matches: Set[int] = set()
+        for i in range(bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            word = self._vocabulary[i]
+            if not word.startswith(prefix):
+                break
+            matches |= self._text_words[word]
+        return matches
+
+    def _select(self, positions: Set[int]) -> List[NodeDefinition]:
+        return [self.nodes[p] for p in sorted(positions)]
+
+    @staticmethod
+    def _intersect(candidates: Optional[Set[int]], positions: Set[int]) -> Set[int]:
+        return set(positions) if candidates is None else candidates & positions
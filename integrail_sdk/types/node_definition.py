@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl, Field
-from typing import Any, Optional
+from pydantic import BaseModel, HttpUrl, ConfigDict, Field
+from typing import Any, Mapping, Optional
 from enum import Enum
 from datetime import date
 
@@ -13,12 +13,14 @@ class NodeDefinitionAvailabilityStatus(str, Enum):
     DEPRECATED = "deprecated"  # Model is not recommended for use, retirement date is assigned.
 
 class NodeDefinitionAvailability(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     status: NodeDefinitionAvailabilityStatus
     message: Optional[str] = None
     deprecation: Optional[date] = None
     retirement: Optional[date] = None
 
 class BaseNodeDefinition(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     name: str
     title: str
     shortId: Optional[str] = Field(None, max_length=5)
@@ -33,3 +35,6 @@ class BaseNodeDefinition(BaseModel):
 class NodeDefinition(BaseNodeDefinition):
     inputs: InputsMetadata
     outputs: OutputsMetadata
+
+    def validate_inputs(self, inputs: Mapping[str, Any]) -> None:
+        self.inputs.validate_inputs(inputs)
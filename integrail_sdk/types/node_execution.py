@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Any, Dict, List, Optional
 from enum import Enum
 from datetime import datetime
@@ -12,6 +12,7 @@ class OutputStateStatus(str, Enum):
     CANCELLED = "cancelled"
 
 class OutputState(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     status: OutputStateStatus
     value: Any
 
@@ -25,6 +26,7 @@ class NodeExecutionStatus(str, Enum):
     ERROR = "error"
 
 class NodeExecutionState(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     status: NodeExecutionStatus
     inputs: Optional[Dict[str, Any]] = None
     outputs: Optional[Dict[str, OutputState | None]] = None
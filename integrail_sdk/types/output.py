@@ -1,4 +1,4 @@
-from pydantic import RootModel
+from pydantic import RootModel, ConfigDict
 from typing import Any, List, Optional
 
 from .data import Type
@@ -11,4 +11,5 @@ class OutputMetadata(Type):
     saveHistory: Optional[bool] = None
 
 class OutputsMetadata(RootModel):
+    model_config = ConfigDict(defer_build=True)
     root: List[OutputMetadata]
\ No newline at end of file
@@ -0,0 +1,63 @@
+from collections import UserString
+from typing import Any, List, Optional
+
+class TextRope(UserString):
+    # Append-only text that is joined lazily on first read. Appending returns a new rope sharing the
+    # chunk list with its predecessor, so earlier values stay unchanged and no characters are copied
+    # until somebody actually reads the text.
+
+    def __init__(self, seq: object = ""):
+        text = str(seq)
+        self._chunks: List[str] = [text] if text else []
+        self._count = len(self._chunks)
+        self._length = len(text)
+        self._text: Optional[str] = text
+        self._prefix: Optional[str] = None
+
+    @classmethod
+    def concat(cls, value: Any, chunk: Any) -> 'TextRope':
+        if not isinstance(value, TextRope):
+            value = cls(value or "")
+        return value.append(chunk)
+
+    @property
+    def data(self) -> str:
+        if self._text is None:
+            if self._prefix is not None:
+                # The previous version was read already: extend its text instead of joining every chunk.
+                self._text = self._prefix + self._chunks[self._count - 1]
+            else:
+                chunks = self._chunks if self._count == len(self._chunks) else self._chunks[:self._count]
+                self._text = "".join(chunks)
+            self._prefix = None
+        return self._text
+
+    @property
+    def delta(self) -> str:
+        return self._chunks[self._count - 1] if self._count else ""
+
+    @property
+    def chunks(self) -> List[str]:
+        return self._chunks[:self._count]
+
+    def append(self, chunk: Any) -> 'TextRope':
+        chunk = str(chunk)
+        if self._count == len(self._chunks):
+            chunks = self._chunks
+        else:
+            # Appending to an older version of the rope: branch off instead of overwriting newer chunks.
+            chunks = self._chunks[:self._count]
+        chunks.append(chunk)
+        rope = self.__class__.__new__(self.__class__)
+        rope._chunks = chunks
+        rope._count = self._count + 1
+        rope._length = self._length + len(chunk)
+        rope._text = None
+        rope._prefix = self._text
+        return rope
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return self.data
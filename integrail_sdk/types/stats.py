@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, Optional
 
 class ExecutionStats(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     cost: Optional[float] = None
     inputTokens: Optional[int] = None
     outputTokens: Optional[int] = None
@@ -10,5 +11,6 @@ class AgentExecutionStats(ExecutionStats):
     count: Optional[int] = None
 
 class AggregatedExecutionStats(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     byAgent: Dict[str, AgentExecutionStats]
     total: ExecutionStats
\ No newline at end of file
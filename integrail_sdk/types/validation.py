@@ -0,0 +1,214 @@
+from pydantic import BaseModel
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from .data import Type, TypeName
+from .fail_mode import FailMode
+
+Check = Callable[[Any, str, List[str]], None]
+
+# Concrete types instead of numbers.Real: ABC instance checks dominate the cost of validating numbers.
+_NUMBER_TYPES = (int, float)
+
+class InputValidationError(ValueError):
+    def __init__(self, errors: List[str]):
+        super().__init__("Invalid inputs: " + "; ".join(errors))
+        self.errors = errors
+
+def _describe(value: Any) -> str:
+    return type(value).__name__
+
+def _plain(value: Any) -> Any:
+    # Media inputs may be passed as the SDK's Image/Audio/... models instead of dicts.
+    if isinstance(value, dict) or not isinstance(value, BaseModel):
+        return value
+    return value.model_dump(mode="json", exclude_none=True)
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, _NUMBER_TYPES) and not isinstance(value, bool)
+
+def _bounds(check_value: Check, length: Callable[[Any], float], low: Optional[float], high: Optional[float], what: str) -> Check:
+    if low is None and high is None:
+        return check_value
+
+    def check(value: Any, path: str, errors: List[str]) -> None:
+        count = len(errors)
+        check_value(value, path, errors)
+        if len(errors) > count:
+            return
+        measured = length(value)
+        if low is not None and measured < low:
+            errors.append(f"{path}: {what} {measured} is below the minimum of {low}")
+        elif high is not None and measured > high:
+            errors.append(f"{path}: {what} {measured} is above the maximum of {high}")
+    return check
+
+def _instance_of(kinds: Any, expected: str) -> Check:
+    def check(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, kinds) or isinstance(value, bool) and kinds is not bool:
+            errors.append(f"{path}: expected {expected}, got {_describe(value)}")
+    return check
+
+def _media(*required: str) -> Check:
+    def check(value: Any, path: str, errors: List[str]) -> None:
+        value = _plain(value)
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object, got {_describe(value)}")
+            return
+        for key in required:
+            if not isinstance(value.get(key), str):
+                errors.append(f"{path}.{key}: expected a string")
+    return check
+
+def _image(value: Any, path: str, errors: List[str]) -> None:
+    value = _plain(value)
+    if not isinstance(value, dict):
+        errors.append(f"{path}: expected an object, got {_describe(value)}")
+    elif not isinstance(value.get("url"), str) and not isinstance(value.get("base64"), str):
+        errors.append(f"{path}: expected a url or base64 string")
+
+def _accept(value: Any, path: str, errors: List[str]) -> None:
+    pass
+
+def compile_type(t: Type, fail_mode: Optional[FailMode] = None) -> Check:
+    # Turns a Type into nested closures once, so validating a value only runs the checks that apply to it
+    # instead of walking the Type model again. `fail_mode` relaxes missing list elements: NEVER accepts
+    # them, ANY requires at least one element to be present and ALL requires every one of them.
+    kind = t.type
+    if kind == TypeName.BOOLEAN:
+        return _instance_of(bool, "a boolean")
+    if kind == TypeName.NUMBER:
+        return _bounds(_instance_of(_NUMBER_TYPES, "a number"), float, t.min, t.max, "value")
+    if kind == TypeName.INTEGER:
+        return _bounds(_instance_of(int, "an integer"), int, t.min, t.max, "value")
+    if kind == TypeName.STRING:
+        # Strings marked `truncate` are cut to `max` by the node instead of being rejected.
+        return _bounds(_instance_of(str, "a string"), len, t.min, None if t.truncate else t.max, "length")
+    if kind == TypeName.ENUM:
+        variants = frozenset(v for v in t.variants or () if isinstance(v, str))
+
+        def check_enum(value: Any, path: str, errors: List[str]) -> None:
+            if value not in variants:
+                errors.append(f"{path}: expected one of {sorted(variants)}, got {value!r}")
+        return check_enum
+    if kind == TypeName.VECTOR:
+        size = t.size if isinstance(t.size, int) else None
+
+        def check_vector(value: Any, path: str, errors: List[str]) -> None:
+            if not isinstance(value, (list, tuple)) or not all(map(_is_number, value)):
+                errors.append(f"{path}: expected a list of numbers")
+            elif size is not None and len(value) != size:
+                errors.append(f"{path}: expected {size} numbers, got {len(value)}")
+        return check_vector
+    if kind == TypeName.OBJECT:
+        properties = [(name, compile_type(p), bool(p.optional)) for name, p in (t.properties or {}).items()]
+
+        def check_object(value: Any, path: str, errors: List[str]) -> None:
+            value = _plain(value)
+            if not isinstance(value, dict):
+                errors.append(f"{path}: expected an object, got {_describe(value)}")
+                return
+            for name, check_property, optional in properties:
+                item = value.get(name)
+                if item is None:
+                    if not optional:
+                        errors.append(f"{path}.{name}: is required")
+                else:
+                    check_property(item, f"{path}.{name}", errors)
+        return check_object
+    if kind == TypeName.LIST:
+        check_element = compile_type(t.elements) if t.elements is not None else _accept
+        if fail_mode == FailMode.ALL:
+            element_optional = False
+        elif fail_mode in (FailMode.ANY, FailMode.NEVER):
+            element_optional = True
+        else:
+            element_optional = t.elements is not None and bool(t.elements.optional)
+
+        def check_list(value: Any, path: str, errors: List[str]) -> None:
+            if not isinstance(value, (list, tuple)):
+                errors.append(f"{path}: expected a list, got {_describe(value)}")
+                return
+            present = 0
+            for i, item in enumerate(value):
+                if item is None:
+                    if not element_optional:
+                        errors.append(f"{path}[{i}]: is required")
+                else:
+                    present += 1
+                    check_element(item, f"{path}[{i}]", errors)
+            if fail_mode == FailMode.ANY and value and not present:
+                errors.append(f"{path}: at least one element is required")
+        return _bounds(check_list, len, t.min, t.max, "length")
+    if kind == TypeName.DICT:
+        check_value = compile_type(t.elements) if t.elements is not None else _accept
+
+        def check_dict(value: Any, path: str, errors: List[str]) -> None:
+            if not isinstance(value, dict):
+                errors.append(f"{path}: expected an object, got {_describe(value)}")
+                return
+            for key, item in value.items():
+                if item is not None:
+                    check_value(item, f"{path}.{key}", errors)
+        return check_dict
+    if kind == TypeName.ONE_OF:
+        checks = [compile_type(v) for v in t.variants or () if isinstance(v, Type)]
+
+        def check_one_of(value: Any, path: str, errors: List[str]) -> None:
+            for check_variant in checks:
+                variant_errors: List[str] = []
+                check_variant(value, path, variant_errors)
+                if not variant_errors:
+                    return
+            errors.append(f"{path}: does not match any of the allowed types")
+        return check_one_of if checks else _accept
+    if kind == TypeName.IMAGE:
+        return _image
+    if kind in (TypeName.AUDIO, TypeName.VIDEO, TypeName.THREE_DIMENSIONAL):
+        return _media("url")
+    if kind == TypeName.FILE:
+        return _media("url", "fileName")
+    if kind in (TypeName.NODE_CALL, TypeName.CALL, TypeName.AUTH_TOKEN):
+        return _media()
+    return _accept
+
+class InputsValidator:
+    # Compiled validator for the inputs of a node or inline agent. Inputs that are neither optional nor
+    # have a default must be present unless their failMode is NEVER; inputs nobody declared are left to
+    # the server.
+
+    def __init__(self, inputs: Sequence[Type]):
+        self._inputs = [
+            (
+                i.name,
+                compile_type(i, getattr(i, "failMode", None)),
+                not i.optional and getattr(i, "default", None) is None and getattr(i, "failMode", None) != FailMode.NEVER,
+            )
+            for i in inputs
+        ]
+        self._types = list(inputs)
+        self._schema: Optional[Dict[str, Any]] = None
+
+    def errors(self, values: Mapping[str, Any]) -> List[str]:
+        errors: List[str] = []
+        for name, check, required in self._inputs:
+            value = values.get(name)
+            if value is None:
+                if required:
+                    errors.append(f"{name}: is required")
+            else:
+                check(value, name, errors)
+        return errors
+
+    def validate(self, values: Mapping[str, Any]) -> None:
+        errors = self.errors(values)
+        if errors:
+            raise InputValidationError(errors)
+
+    def json_schema(self) -> Dict[str, Any]:
+        if self._schema is None:
+            self._schema = {
+                "type": "object",
+                "properties": {t.name: Type.to_json_schema(t) for t in self._types},
+                "required": [name for name, _, required in self._inputs if required],
+            }
+        return self._schema
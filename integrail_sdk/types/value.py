@@ -1,70 +1,88 @@
-from pydantic import BaseModel, RootModel
-from typing import Dict, List, Union
+from functools import lru_cache
+from pydantic import BaseModel, Discriminator, ConfigDict, RootModel, Tag, TypeAdapter
+from typing import Any, Dict, List, Optional, Union
+from typing_extensions import Annotated
 
 from .data import ExternalService, TypeName
 
 class BooleanValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.BOOLEAN
     value: bool
 
 class NumberValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.NUMBER
     value: float
 
 class IntegerValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.INTEGER
     value: int
 
 class StringValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.STRING
     value: str
 
 class VectorValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.VECTOR
     value: List[float]
 
 class ObjectValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.OBJECT
     value: Dict[str, 'Value']
 
 class ListValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.LIST
     value: List['Value']
 
 class DictValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.DICT
     value: Dict[str, 'Value']
 
 class UrlImageValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.IMAGE
     url: str
 
 class Base64ImageValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.IMAGE
     base64: str
 
 class ImageValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.IMAGE
     url: Union[str, None] = None
     base64: Union[str, None] = None
 
 class VideoValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.VIDEO
     url: str
 
 class AudioValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.AUDIO
     url: str
 
 class ThreeDimensionalValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.THREE_DIMENSIONAL
     url: str
 
 class FileValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.FILE
     url: str
 
 class AuthTokenValue(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     type: TypeName = TypeName.AUTH_TOKEN
     service: ExternalService
     value: str
@@ -87,10 +105,62 @@ ValueUnion = Union[
     AuthTokenValue,
 ]
 
+# Tag of each variant; images are split by which source field they carry.
+_VALUE_CLASSES: Dict[str, Any] = {
+    TypeName.BOOLEAN.value: BooleanValue,
+    TypeName.NUMBER.value: NumberValue,
+    TypeName.INTEGER.value: IntegerValue,
+    TypeName.STRING.value: StringValue,
+    TypeName.VECTOR.value: VectorValue,
+    TypeName.OBJECT.value: ObjectValue,
+    TypeName.LIST.value: ListValue,
+    TypeName.DICT.value: DictValue,
+    "image:url": UrlImageValue,
+    "image:base64": Base64ImageValue,
+    TypeName.VIDEO.value: VideoValue,
+    TypeName.AUDIO.value: AudioValue,
+    TypeName.THREE_DIMENSIONAL.value: ThreeDimensionalValue,
+    TypeName.FILE.value: FileValue,
+    TypeName.AUTH_TOKEN.value: AuthTokenValue,
+}
+_UNTAGGED = "untagged"
+
+def _value_tag(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        fields = value
+    elif isinstance(value, BaseModel):
+        fields = value.__dict__
+    else:
+        return None
+    kind = fields.get("type")
+    if isinstance(kind, TypeName):
+        kind = kind.value
+    if kind == TypeName.IMAGE:
+        if fields.get("url") is not None:
+            return "image:url"
+        return "image:base64" if fields.get("base64") is not None else None
+    return kind if kind in _VALUE_CLASSES else None
+
+def _value_discriminator(value: Any) -> str:
+    # Values without a known `type` (e.g. relying on the field default) go through the old left-to-right union.
+    tag = _value_tag(value)
+    return _UNTAGGED if tag is None else tag
+
+TaggedValueUnion = Annotated[
+    Union[
+        tuple(Annotated[cls, Tag(tag)] for tag, cls in _VALUE_CLASSES.items())
+        + (Annotated[ValueUnion, Tag(_UNTAGGED)],)
+    ],
+    Discriminator(_value_discriminator),
+]
+
 class Value(RootModel):
-    root: ValueUnion
+    model_config = ConfigDict(defer_build=True)
+    root: TaggedValueUnion
+
+@lru_cache(maxsize=None)
+def type_adapter(t: Any) -> TypeAdapter:
+    # Building a TypeAdapter compiles a validator; reuse it for e.g. List[ChatMessage].
+    return TypeAdapter(t)
 
-# To handle forward references
-ObjectValue.update_forward_refs()
-ListValue.update_forward_refs()
-DictValue.update_forward_refs()
+# Forward references are resolved when the deferred models are first built.
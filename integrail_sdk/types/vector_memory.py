@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
 class VectorMemory(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     name: str
     status: str
     colName: str
@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from integrail_sdk import IntegrailCloudApi
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def timestamp(ms: int) -> str:
+    return (START + timedelta(milliseconds=ms)).isoformat().replace("+00:00", "Z")
+
+def execution(execution_id: str = "e1", status: str = "running") -> Dict[str, Any]:
+    return {
+        "_id": execution_id,
+        "status": status,
+        "updatedAt": timestamp(0),
+        "pipeline": {
+            "inputs": [],
+            "outputs": [{"name": "answer", "type": "string", "value": "x"}],
+            "nodes": [{"id": "n1", "name": "llm"}],
+        },
+        "state": {},
+        "inputs": {},
+        "outputs": {},
+    }
+
+def token_events(count: int, execution_id: str = "e1") -> List[Dict[str, Any]]:
+    # An execution whose node "n1" streams `count` tokens to its output "text" and to the agent output "answer".
+    events = [
+        {"op": "init", "createdAt": timestamp(0), "execution": execution(execution_id)},
+        {"op": "node.updateStatus", "createdAt": timestamp(0), "nodeId": "n1", "status": "running"},
+    ]
+    for i in range(count):
+        events.append({"op": "node.output.update", "createdAt": timestamp(i + 1), "nodeId": "n1", "output": "text",
+                       "status": "running", "value": f"t{i} ", "append": True})
+        events.append({"op": "output.update", "createdAt": timestamp(i + 1), "output": "answer",
+                       "value": f"t{i} ", "append": True})
+    events.append({"op": "node.updateStatus", "createdAt": timestamp(count + 1), "nodeId": "n1", "status": "finished",
+                   "stats": {"cost": 1.5, "inputTokens": 3, "outputTokens": count}})
+    events.append({"op": "updateStatus", "createdAt": timestamp(count + 2), "status": "finished"})
+    return events
+
+def token_text(count: int) -> str:
+    return "".join(f"t{i} " for i in range(count))
+
+class FakeServer:
+    # Enough of the Integrail API on a local port to run executions against: streaming and non-streaming
+    # execute, reading and cancelling executions, and the node list. Tests steer it through the attributes
+    # set in __init__ and read back the requests it got.
+
+    def __init__(self, tokens: int = 20):
+        self.events = token_events(tokens)
+        self.chunk_size = 64        # Bytes per write of a streamed response.
+        self.delay = 0.0            # Seconds between two writes.
+        self.cut: Optional[int] = None  # Drop the connection after this many events.
+        self.failures = 0           # Answer this many of the next requests with 503.
+        self.execution: Dict[str, Any] = {**execution(), "status": "finished", "events": self.events[1:]}
+        self.requests: List[Dict[str, Any]] = []
+        self.peers = set()
+        self.cancelled: List[str] = []
+        self.app = web.Application()
+        self.app.router.add_post("/api/{account}/agent/{agent}/execute", self._execute)
+        self.app.router.add_post("/api/node/execute", self._execute)
+        self.app.router.add_get("/api/node/list", self._node_list)
+        self.app.router.add_get("/api/{account}/execution/{id}", self._get_execution)
+        self.app.router.add_post("/api/{account}/execution/{id}/cancel", self._cancel)
+        self._server: Optional[TestServer] = None
+
+    async def __aenter__(self) -> 'FakeServer':
+        self._server = TestServer(self.app)
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self._server.close()
+
+    @property
+    def base_uri(self) -> str:
+        return str(self._server.make_url("/"))
+
+    def client(self, **options: Any) -> IntegrailCloudApi:
+        return IntegrailCloudApi({"apiToken": "token", "baseUri": self.base_uri, **options})
+
+    def count(self, path: str) -> int:
+        return sum(1 for request in self.requests if request["path"] == path)
+
+    def _record(self, request: web.Request, body: Any = None) -> Optional[web.Response]:
+        self.requests.append({"method": request.method, "path": request.path, "headers": dict(request.headers), "body": body})
+        self.peers.add(request.transport.get_extra_info("peername"))
+        if self.failures:
+            self.failures -= 1
+            return web.json_response({"message": "unavailable"}, status=503)
+        return None
+
+    async def _execute(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        failure = self._record(request, body)
+        if failure is not None:
+            return failure
+        if not body.get("stream"):
+            return web.json_response({"status": "ok", "executionId": "e1"})
+        response = web.StreamResponse()
+        response.content_type = "application/x-ndjson"
+        await response.prepare(request)
+        events = self.events if self.cut is None else self.events[:self.cut]
+        data = "".join(json.dumps(event) + "\n" for event in events).encode()
+        try:
+            for start in range(0, len(data), self.chunk_size):
+                await response.write(data[start:start + self.chunk_size])
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+        except (ConnectionError, asyncio.CancelledError):
+            return response
+        if self.cut is not None:
+            request.transport.abort()
+            return response
+        await response.write_eof()
+        return response
+
+    async def _node_list(self, request: web.Request) -> web.Response:
+        return self._record(request) or web.json_response({"nodes": []})
+
+    async def _get_execution(self, request: web.Request) -> web.Response:
+        return self._record(request) or web.json_response({"status": "ok", "execution": self.execution})
+
+    async def _cancel(self, request: web.Request) -> web.Response:
+        failure = self._record(request)
+        if failure is not None:
+            return failure
+        self.cancelled.append(request.match_info["id"])
+        return web.json_response({"status": "ok"})
@@ -0,0 +1,60 @@
+from integrail_sdk.api import ExecutionCache, EventSubscription, SingleNodeExecuteRequest
+
+from .fake_server import FakeServer, token_text
+
+EXECUTE = "/api/node/execute"
+
+def request(**inputs):
+    return SingleNodeExecuteRequest(nodeName="llm", inputs=inputs, stream=True)
+
+async def collect(api, payload, **kwargs):
+    delivered = []
+
+    async def on_event(event, execution):
+        delivered.append(event.root.op.value)
+
+    result = await api.node.execute(payload, on_event, **kwargs)
+    return delivered, result
+
+async def test_finished_executions_are_replayed():
+    async with FakeServer(tokens=5) as server:
+        async with server.client(executionCache={}) as api:
+            first, result = await collect(api, request(a=1, b=2))
+            replayed, replayed_result = await collect(api, request(b=2, a=1))
+            assert server.count(EXECUTE) == 1
+            assert replayed == first
+            # Without a startedAt from the server, it is the time the first event was applied.
+            assert replayed_result.model_dump(exclude={"startedAt"}) == result.model_dump(exclude={"startedAt"})
+            assert replayed_result.outputs == {"answer": token_text(5)}
+            non_streaming = await api.node.execute(SingleNodeExecuteRequest(nodeName="llm", inputs={"a": 1, "b": 2}))
+            assert non_streaming == {"status": "ok", "executionId": "e1"} and server.count(EXECUTE) == 1
+            await collect(api, request(a=1, b=2), use_cache=False)
+            await collect(api, request(a=2))
+            assert server.count(EXECUTE) == 3
+            assert api.execution_cache.stats.hits == 2
+
+async def test_subscribed_executions_are_not_recorded():
+    async with FakeServer(tokens=5) as server:
+        async with server.client(executionCache={}) as api:
+            await collect(api, request(a=1), subscription=EventSubscription(ops=["output.update"]))
+            await collect(api, request(a=1))
+        assert server.count(EXECUTE) == 2
+
+async def test_persistent_cache_is_not_shared_between_api_tokens(tmp_path):
+    options = {"executionCache": {"path": str(tmp_path / "executions.db")}}
+    async with FakeServer(tokens=5) as server:
+        async with server.client(**options, apiToken="a") as first:
+            await collect(first, request(a=1))
+        async with server.client(**options, apiToken="b") as other:
+            await collect(other, request(a=1))
+        assert server.count(EXECUTE) == 2
+        async with server.client(**options, apiToken="a") as again:
+            await collect(again, request(a=1))
+            assert again.execution_cache.stats.diskHits == 1
+        assert server.count(EXECUTE) == 2
+
+def test_key_ignores_key_order_and_delivery_fields():
+    key = ExecutionCache.key("api/node/execute", {"nodeName": "llm", "inputs": {"a": 1, "b": 2}, "stream": True})
+    assert key == ExecutionCache.key("api/node/execute", {"inputs": {"b": 2, "a": 1}, "nodeName": "llm", "externalId": "x"})
+    assert key != ExecutionCache.key("api/node/execute", {"nodeName": "llm", "inputs": {"a": 1, "b": 2}}, "v2")
+    assert key != ExecutionCache.key("api/node/execute", {"nodeName": "llm", "inputs": {"a": 1, "b": 2}}, None, "tenant")
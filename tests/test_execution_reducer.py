@@ -0,0 +1,92 @@
+import copy
+import pickle
+
+import pytest
+
+from integrail_sdk.api import BaseAgentApi
+from integrail_sdk.types import AgentExecution, AgentExecutionStatus, ExecutionReducer
+
+from .fake_server import execution, timestamp, token_events, token_text
+
+def parse(events, lite=False):
+    parse_event = BaseAgentApi.parse_event_lite if lite else BaseAgentApi.parse_event
+    return [parse_event(event) for event in events]
+
+def reduce(events, lite=False):
+    parsed = parse(events, lite)
+    reducer = ExecutionReducer.from_init(parsed[0])
+    for event in parsed[1:]:
+        reducer.apply(event)
+    return reducer
+
+@pytest.mark.parametrize("lite", [False, True])
+def test_reducer_applies_streamed_events(lite):
+    result = reduce(token_events(30), lite).snapshot()
+    assert result.status == AgentExecutionStatus.FINISHED
+    assert result.outputs == {"answer": token_text(30)}
+    node = result.state["n1"]
+    assert node.status.value == "finished"
+    assert node.outputs["text"].value == token_text(30)
+    assert node.updatedAt.isoformat().replace("+00:00", "Z") == timestamp(31)
+    assert result.finishedAt.isoformat().replace("+00:00", "Z") == timestamp(32)
+    assert result.stats.cost == 1.5 and result.stats.outputTokens == 30
+    assert result.events == []
+
+def test_snapshots_keep_their_state():
+    events = parse(token_events(10))
+    reducer = ExecutionReducer.from_init(events[0])
+    snapshots = []
+    for event in events[1:]:
+        reducer.apply(event)
+        snapshots.append(reducer.snapshot())
+    # Two events per token after the node status event.
+    early = snapshots[10]
+    assert early.outputs == {"answer": token_text(5)}
+    assert early.state["n1"].outputs["text"].value == token_text(5)
+    assert early.status == AgentExecutionStatus.RUNNING
+    assert snapshots[-1].outputs == {"answer": token_text(10)}
+    assert reducer.snapshot() is snapshots[-1]
+
+def test_snapshots_behave_like_validated_executions():
+    snapshot = reduce(token_events(5)).snapshot()
+    validated = AgentExecution.model_validate(snapshot.model_dump(by_alias=True))
+    assert snapshot == validated
+    assert snapshot.model_dump_json() == validated.model_dump_json()
+    assert copy.deepcopy(snapshot) == snapshot
+    assert pickle.loads(pickle.dumps(snapshot)) == snapshot
+    assert dict(snapshot)["outputs"] == {"answer": token_text(5)}
+
+def test_lazy_executions_compare_by_value():
+    data = execution()
+    lazy, other = AgentExecution.validate_lazy(data), AgentExecution.validate_lazy(data)
+    validated = AgentExecution.model_validate(data)
+    assert lazy == other == validated
+    assert "pipeline=" in repr(lazy)
+    other.pipeline
+    assert lazy == other
+
+def test_node_output_events_before_their_node_are_applied_once_it_appears():
+    events = token_events(3)
+    node_outputs = [event for event in events if event["op"] == "node.output.update"]
+    rest = [event for event in events[1:] if event["op"] != "node.output.update"]
+    # Token events first, newest first, then the status event of the node.
+    reordered = [events[0], *reversed(node_outputs), *rest]
+    result = reduce(reordered).snapshot()
+    assert result.state["n1"].outputs["text"].value == token_text(3)
+
+def test_apply_event_chain_extends_the_previous_result():
+    events = parse(token_events(50))
+    results = [AgentExecution.init(events[0].root)]
+    for event in events[1:]:
+        results.append(AgentExecution.apply_event(results[-1], event.root))
+    assert results[-1].outputs == {"answer": token_text(50)}
+    assert results[21].outputs == {"answer": token_text(10)}
+    # A copy of an earlier result starts over from its own values.
+    branch = results[21].model_copy(update={"outputs": {"answer": "x"}})
+    branched = AgentExecution.apply_event(branch, events[23].root)
+    assert branched.outputs == {"answer": "x" + "t10 "}
+    assert results[23].outputs == {"answer": token_text(11)}
+
+def test_lite_events_parse_timestamps_on_read():
+    reducer = reduce(token_events(2), lite=True)
+    assert reducer.last_event_at.isoformat().replace("+00:00", "Z") == timestamp(4)
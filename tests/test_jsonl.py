@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from integrail_sdk.helpers.fast_json import _json_loads, loads
+from integrail_sdk.helpers.jsonl import JsonlDecoder, JsonlLineTooLongError
+
+@pytest.fixture(params=["default", "json"])
+def decoder(request):
+    return JsonlDecoder(loads if request.param == "default" else _json_loads)
+
+def test_lines_split_across_chunks(decoder):
+    data = "".join(json.dumps({"i": i, "text": "é" * i}) + "\n" for i in range(20)).encode()
+    items = []
+    for start in range(0, len(data), 7):
+        items += decoder.feed(data[start:start + 7])
+    items += decoder.flush()
+    assert items == [{"i": i, "text": "é" * i} for i in range(20)]
+
+def test_blank_lines_are_skipped(decoder):
+    assert decoder.feed(b'{"a":1}\n\n   \n\t\r\n  {"b":2}\r\n') == [{"a": 1}, {"b": 2}]
+    assert decoder.feed(b"  ") == [] and decoder.flush() == []
+
+def test_invalid_lines_raise_value_error(decoder):
+    with pytest.raises(ValueError):
+        decoder.feed(b'{"a":1}\n{broken\n')
+    with pytest.raises(ValueError):
+        JsonlDecoder(decoder.loads).feed(b"  x\n")
+
+def test_rejected_lines_are_not_parsed():
+    decoder = JsonlDecoder(accept=lambda line: b'"keep"' in bytes(line), rejected=lambda line: None)
+    assert decoder.feed(b'{"keep":1}\n{not json\n{"keep":2}\n') == [{"keep": 1}, None, {"keep": 2}]
+
+def test_line_size_is_limited():
+    decoder = JsonlDecoder(max_line_size=16)
+    assert decoder.feed(b'{"a":1}\n') == [{"a": 1}]
+    with pytest.raises(JsonlLineTooLongError):
+        decoder.feed(b'{"a":"' + b"x" * 32)
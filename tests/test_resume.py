@@ -0,0 +1,58 @@
+import pytest
+
+from integrail_sdk.api import DISCONNECT_ERRORS, CloudAgentExecuteStreamingRequest, EventSubscription
+from integrail_sdk.types import AgentExecutionStatus
+
+from .fake_server import FakeServer, execution, token_text
+
+REQUEST = CloudAgentExecuteStreamingRequest(inputs={})
+RESUME = {"resume": {"initialInterval": 0.01}, "retry": {"maxRetries": 0}}
+
+async def run(api, **kwargs):
+    delivered, finished = [], []
+
+    async def on_event(event, execution):
+        delivered.append((event.root.op.value, getattr(event.root, "value", None)))
+
+    async def on_finish(execution):
+        finished.append(execution.status)
+
+    result = await api.agent.execute("agent", "account", REQUEST, on_event, on_finish, **kwargs)
+    return delivered, finished, result
+
+@pytest.mark.parametrize("cut", [1, 2, 3, 21, 42])
+@pytest.mark.parametrize("lite", [False, True])
+async def test_dropped_stream_continues_after_the_last_event(cut, lite):
+    async with FakeServer(tokens=20) as server:
+        server.cut = cut
+        async with server.client(**RESUME) as api:
+            delivered, finished, result = await run(api, lite=lite)
+        assert delivered == [(event["op"], event.get("value")) for event in server.events]
+        assert finished == [AgentExecutionStatus.FINISHED]
+        assert result.outputs == {"answer": token_text(20)}
+        assert server.count("/api/account/execution/e1") == 1
+
+async def test_resume_without_events_delivers_the_final_status():
+    async with FakeServer(tokens=20) as server:
+        server.cut = 10
+        server.execution = {**execution(), "status": "finished", "outputs": {"answer": "final"}}
+        async with server.client(**RESUME) as api:
+            delivered, finished, result = await run(api)
+        assert [op for op, _ in delivered].count("init") == 1
+        assert delivered[-1] == ("updateStatus", None)
+        assert finished == [AgentExecutionStatus.FINISHED] and result.outputs == {"answer": "final"}
+
+async def test_resume_counts_lines_skipped_by_a_subscription():
+    async with FakeServer(tokens=20) as server:
+        server.cut = 11
+        async with server.client(**RESUME) as api:
+            delivered, _, _ = await run(api, subscription=EventSubscription(outputs=["answer"]))
+        assert "".join(value for op, value in delivered if op == "output.update") == token_text(20)
+
+async def test_disconnect_is_raised_without_resume():
+    async with FakeServer(tokens=20) as server:
+        server.cut = 10
+        async with server.client(resume=None) as api:
+            with pytest.raises(DISCONNECT_ERRORS):
+                await run(api)
+        assert server.count("/api/account/execution/e1") == 0
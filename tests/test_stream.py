@@ -0,0 +1,77 @@
+import asyncio
+
+from integrail_sdk.api import CloudAgentExecuteStreamingRequest, EventSubscription
+from integrail_sdk.types import AgentExecutionStatus
+
+from .fake_server import FakeServer, token_text
+
+REQUEST = CloudAgentExecuteStreamingRequest(inputs={})
+
+async def test_execute_delivers_every_event_with_its_snapshot():
+    async with FakeServer(tokens=30) as server:
+        delivered, finished = [], []
+
+        async def on_event(event, execution):
+            delivered.append((event.root.op.value, execution.outputs.get("answer") or ""))
+
+        async def on_finish(execution):
+            finished.append(execution.status)
+
+        async with server.client() as api:
+            result = await api.agent.execute("agent", "account", REQUEST, on_event, on_finish)
+        assert [op for op, _ in delivered] == [event["op"] for event in server.events]
+        texts = [text for _, text in delivered]
+        assert texts == sorted(texts, key=len) and texts[-1] == token_text(30)
+        assert finished == [AgentExecutionStatus.FINISHED]
+        assert result.status == AgentExecutionStatus.FINISHED and result.outputs == {"answer": token_text(30)}
+
+async def test_stream_drops_token_events_when_the_consumer_falls_behind():
+    async with FakeServer(tokens=200) as server:
+        async with server.client() as api:
+            async with api.agent.stream("agent", "account", REQUEST, max_queue=4, overflow="drop") as stream:
+                await asyncio.sleep(0.2)
+                items = [item async for item in stream]
+        ops = [event.root.op.value for event, _ in items]
+        assert stream.dropped > 0 and len(items) + stream.dropped == len(server.events)
+        assert ops[0] == "init" and ops[-1] == "updateStatus"
+        assert items[-1][1].outputs == {"answer": token_text(200)}
+
+async def test_subscription_applies_node_status_events_it_does_not_deliver():
+    async with FakeServer(tokens=10) as server:
+        delivered = []
+
+        async def on_event(event, execution):
+            delivered.append(event.root.op.value)
+
+        async with server.client() as api:
+            result = await api.agent.execute(
+                "agent", "account", REQUEST, on_event, subscription=EventSubscription(ops=["output.update"]))
+        assert set(delivered) == {"init", "output.update", "updateStatus"}
+        assert result.state["n1"].status.value == "finished"
+        assert result.outputs == {"answer": token_text(10)}
+        assert result.state["n1"].outputs is None
+
+async def test_abandoned_stream_is_closed_and_cancelled():
+    async with FakeServer(tokens=2000) as server:
+        async with server.client() as api:
+            async def consume():
+                # No `async with`: the stream is only dropped.
+                async for event, _ in api.agent.stream("agent", "account", REQUEST, max_queue=8):
+                    if event.root.op.value == "output.update":
+                        break
+
+            await consume()
+            await asyncio.sleep(0.1)
+            assert server.cancelled == ["e1"]
+            assert not api.agent._producers
+
+async def test_closing_the_client_stops_open_streams():
+    async with FakeServer(tokens=2000) as server:
+        api = server.client()
+        stream = api.agent.stream("agent", "account", REQUEST, max_queue=8)
+        async for event, _ in stream:
+            if event.root.op.value == "output.update":
+                break
+        await api.aclose()
+        assert server.cancelled == ["e1"]
+        assert stream._producer.done() and api.transport.closed
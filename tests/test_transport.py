@@ -0,0 +1,58 @@
+import pytest
+
+from integrail_sdk.api import (
+    ApiConnectionError,
+    ApiServerError,
+    CloudAgentExecuteNonStreamingRequest,
+    CloudAgentExecuteStreamingRequest,
+)
+
+from .fake_server import FakeServer
+
+NO_BACKOFF = {"retry": {"backoffBase": 0, "jitter": False}}
+
+async def test_sub_apis_share_one_pooled_connection():
+    async with FakeServer() as server:
+        async with server.client() as api:
+            await api.node.list()
+            await api.agent.execute("agent", "account", CloudAgentExecuteNonStreamingRequest(inputs={}))
+            await api.execution.get("account", "e1")
+            assert api.agent.transport is api.node.transport is api.transport
+        assert len(server.peers) == 1
+        assert {request["headers"]["Authorization"] for request in server.requests} == {"Bearer token"}
+
+async def test_idempotent_requests_are_retried():
+    async with FakeServer() as server:
+        server.failures = 2
+        async with server.client(**NO_BACKOFF) as api:
+            await api.node.list()
+        assert server.count("/api/node/list") == 3
+
+async def test_executions_are_retried_only_with_an_external_id():
+    async with FakeServer() as server:
+        async with server.client(**NO_BACKOFF) as api:
+            server.failures = 1
+            with pytest.raises(ApiServerError):
+                await api.agent.execute("agent", "account", CloudAgentExecuteNonStreamingRequest(inputs={}))
+            assert server.count("/api/account/agent/agent/execute") == 1
+            server.failures = 1
+            result = await api.agent.execute(
+                "agent", "account", CloudAgentExecuteNonStreamingRequest(inputs={}, externalId="x"))
+            assert result["executionId"] == "e1"
+            assert server.count("/api/account/agent/agent/execute") == 3
+
+async def test_closed_client_refuses_requests():
+    async with FakeServer() as server:
+        api = server.client()
+        await api.node.list()
+        await api.aclose()
+        assert api.transport.closed
+        with pytest.raises(ApiConnectionError):
+            await api.node.list()
+        with pytest.raises(ApiConnectionError):
+            await api.agent.execute("agent", "account", CloudAgentExecuteStreamingRequest(inputs={}), _ignore)
+        assert api.transport._session is None
+        assert server.count("/api/node/list") == 1
+
+async def _ignore(event, execution):
+    pass